@@ -5,7 +5,23 @@
 
 from __future__ import print_function
 
+import asyncio
+import atexit
+import base64
+import collections
+import copy
+import functools
+import hashlib
+import itertools
+import json
+import os
+import queue
+import struct
+import threading
 import time
+import warnings
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import PSL.commands_proto as CP
 import PSL.packet_handler as packet_handler
@@ -37,6 +53,17 @@ class ScienceLab():
 	+==========+=================================================================+
 	|timeout   | serial port read timeout. default = 1s                          |
 	+----------+-----------------------------------------------------------------+
+	|lazy      | defer peripheral setup, wave table uploads and the device ID    |
+	|          | read until first use. default = False                           |
+	+----------+-----------------------------------------------------------------+
+	|simulate  | use a software device instead of hardware. default = False.     |
+	|          | Other keyword arguments are passed on to SimulatedSerial        |
+	+----------+-----------------------------------------------------------------+
+	|device_   | True, or the path of a :class:`DeviceCache` file. Reconnects to |
+	|cache     | a known device restore its ID, corrections and flash pages from |
+	|          | the file. default = None (not used). Cached flash pages are     |
+	|          | assumed to be current, see :class:`DeviceCache`                 |
+	+----------+-----------------------------------------------------------------+
 	>>> from PSL import sciencelab
 	>>> I = sciencelab.connect()
 	>>> self.__print__(I)
@@ -46,7 +73,8 @@ class ScienceLab():
 	"""
 
     BAUD = 1000000
-    WType = {'W1': 'sine', 'W2': 'sine'}
+    FLASH_PAGE_SIZE = 2048
+    AUTORANGE_CUTOFFS = [(8, 1), (4, 2), (3, 4), (2, 5), (1.5, 8), (1, 10), (.5, 16), (0, 32)]  # (|V| above, gain)
 
     def __init__(self, timeout=1.0, **kwargs):
         self.verbose = kwargs.get('verbose', False)
@@ -63,54 +91,164 @@ class ScienceLab():
         self.digital_channels_in_buffer = 0
         self.currents = [0.55e-3, 0.55e-6, 0.55e-5, 0.55e-4]
         self.currentScalers = [1.0, 1.0, 1.0, 1.0]
+        self.capacitance_fixtures = {}  # fixture -> last good range and charge time. see get_capacitance_fast
 
         self.sine1freq = None
         self.sine2freq = None
         self.sqrfreq = {'SQR1': None, 'SQR2': None, 'SQR3': None, 'SQR4': None}
         self.aboutArray = []
         self.errmsg = ''
+        self.lock = threading.RLock()  # held for the duration of every call routed through the I/O worker
+        self.worker = None
         # --------------------------Initialize communication handler, and subclasses-----------------
-        self.H = packet_handler.Handler(**kwargs)
+        start = time.perf_counter()
+        if kwargs.get('simulate', False):
+            self.H = SimulatedHandler(**kwargs)
+        else:
+            self.H = packet_handler.Handler(**kwargs)
+        self.startup_times = [('connect', time.perf_counter() - start)]
         self.oscilloscope = Oscilloscope(device=self.H)
         self.__runInitSequence__(**kwargs)
 
     def __runInitSequence__(self, **kwargs):
         self.aboutArray = []
-        from PSL.Peripherals import I2C, SPI, NRF24L01, MCP4728
+        self.lazy = kwargs.get('lazy', False)
         self.connected = self.H.connected
         if not self.H.connected:
             self.__print__('Check hardware connections. Not connected')
 
         self.streaming = False
+        self.stream = None
         self.buff = np.zeros(10000)
         self.SOCKET_CAPACITANCE = 42e-12  # 42e-12 is typical for the FOSSASIA PSLab. Actual values require calibration (currently not supported).
         self.resistanceScaling = 1.
 
         self.digital_channel_names = digital_channel_names
         self.allDigitalChannels = self.digital_channel_names
-        self.gains = {'CH1': 0, 'CH2': 0}
+        self.gains = {'CH1': 0, 'CH2': 0}  # gain last chosen by autoranging. 0 : not ranged yet
+        self.autorange_hysteresis = 0.1
+        self.autorange_callback = None
+        self.WType = {'W1': None, 'W2': None}  # table loaded on each wavegen. None until known
+        self.loaded_tables = {'W1': None, 'W2': None}  # digest of the WAVE_TABLES entry on each wavegen
+        self.flash_cache = {}  # page -> contents, filled by __read_flash_page__
+        self.wavegen_registers = {}  # last WAVEGEN command sent for each output. see __push_wavegen__
 
         # This array of four instances of digital_channel is used to store data retrieved from the
         # logic analyzer section of the device.  It also contains methods to generate plottable data
         # from the original timestamp arrays.
-        self.dchans = [digital_channel(a) for a in range(4)]
+        self.dchans = [LazyDigitalChannel(a) for a in range(4)]
+        self.LA_timestamps = np.zeros((4, self.MAX_SAMPLES // 4))  # filled by fetch_LA_channels(incremental=True)
+        self.__reset_LA_fetch__()
 
-        self.I2C = I2C(self.H)
-        # self.I2C.pullSCLLow(5000)
-        self.SPI = SPI(self.H)
-        self.hexid = ''
+        self._hexid = None
+        for a in ['I2C', 'SPI', 'NRF', 'DAC']:
+            self.__dict__.pop(a, None)
         if self.H.connected:
+            start = time.perf_counter()
             for a in ['CH1', 'CH2']:
                 self.oscilloscope._channels[a].gain = 1
+            self.startup_times.append(('gain', time.perf_counter() - start))
+        self.device_cache = None
+        self.device_cache_dirty = False  # the device cache file is missing changes made since it was saved
+        if kwargs.get('device_cache') and self.H.connected:
+            self.__load_device_cache__(kwargs['device_cache'])
+        if self.lazy: return  # peripherals, wave tables and hexid are set up on first use
+
+        for a in ['I2C', 'SPI']: self.__init_peripheral__(a)
+        if self.H.connected:
+            start = time.perf_counter()
             for a in ['W1', 'W2']: self.load_equation(a, 'sine')
-            self.SPI.set_parameters(1, 7, 1, 0)
-            self.hexid = hex(self.device_id())
+            self.startup_times.append(('wave tables', time.perf_counter() - start))
+            self.hexid  # reads the device ID
+        for a in ['NRF', 'DAC']: self.__init_peripheral__(a)
+        self.__flush_device_cache__()
+
+    def __init_peripheral__(self, name):
+        """
+		Creates one of the I2C, SPI, NRF and DAC peripherals, and records how long that took in self.startup_times.
+		"""
+        from PSL.Peripherals import I2C, SPI, NRF24L01, MCP4728
+        start = time.perf_counter()
+        if name == 'I2C':
+            p = I2C(self.H)
+            # p.pullSCLLow(5000)
+        elif name == 'SPI':
+            p = SPI(self.H)
+            if self.H.connected: p.set_parameters(1, 7, 1, 0)
+        elif name == 'NRF':
+            p = NRF24L01(self.H)
+            self.aboutArray.append(['Radio Transceiver is :', 'Installed' if p.ready else 'Not Installed'])
+        else:
+            p = MCP4728(self.H, 3.3, 0)
+        self.__dict__[name] = p
+        self.startup_times.append((name, time.perf_counter() - start))
+        return p
+
+    def __getattr__(self, name):
+        # Only reached when normal lookup fails: peripherals of a lazily initialized instance are created here.
+        if name in ('I2C', 'SPI', 'NRF', 'DAC') and 'H' in self.__dict__:
+            return self.__init_peripheral__(name)
+        raise AttributeError("'ScienceLab' object has no attribute '%s'" % name)
+
+    @property
+    def hexid(self):
+        """
+		Unique ID of the device as a hex string, read with :func:`device_id` the first time it is needed.
+		"""
+        if self._hexid is None:
+            start = time.perf_counter()
+            self._hexid = hex(self.device_id()) if self.H.connected else ''
+            self.startup_times.append(('hexid', time.perf_counter() - start))
+            self.device_cache_dirty = True
+        return self._hexid
+
+    def __load_device_cache__(self, path):
+        """
+		Restores hexid, SOCKET_CAPACITANCE, currentScalers, resistanceScaling and flash_cache from the cache entry of
+		the device last seen on this port. The entry is only used if the firmware version and the last word of the
+		device ID (one read instead of four) still match.
+		Changes are written back once the connection is set up, by :func:`save_device_cache`, and at exit.
+		"""
+        start = time.perf_counter()
+        if self.device_cache is None: atexit.register(_flush_device_cache_at_exit, weakref.ref(self))
+        self.device_cache = DeviceCache(None if path is True else path)
+        version = getattr(self.H, 'version_string', None) or self.get_version()
+        entry = self.device_cache.lookup(self.H.portname, version, self.read_program_address(0x800FFE))
+        if entry is not None:
+            self._hexid = entry['hexid']
+            self.SOCKET_CAPACITANCE = entry['SOCKET_CAPACITANCE']
+            self.currentScalers = list(entry['currentScalers'])
+            self.resistanceScaling = entry['resistanceScaling']
+            self.flash_cache.update({int(page): base64.b64decode(data) for page, data in entry['flash'].items()})
+        self.startup_times.append(('device cache', time.perf_counter() - start))
 
-        self.NRF = NRF24L01(self.H)
+    def save_device_cache(self):
+        """
+		Stores the identity, corrections and cached flash pages of this device in its :class:`DeviceCache` entry.
+		Call it after changing SOCKET_CAPACITANCE, currentScalers or resistanceScaling to make them persistent.
+		Flash pages read since the last save are stored as well. They are otherwise saved at exit.
+		"""
+        if self.device_cache is None: raise RuntimeError('Connect with device_cache=True to use the device cache')
+        self.device_cache_dirty = False
+        self.device_cache.store(self.hexid, self.H.portname,
+                                version=getattr(self.H, 'version_string', None) or self.get_version(),
+                                SOCKET_CAPACITANCE=self.SOCKET_CAPACITANCE,
+                                currentScalers=list(self.currentScalers),
+                                resistanceScaling=self.resistanceScaling,
+                                flash={str(page): base64.b64encode(data).decode()
+                                       for page, data in self.flash_cache.items()})
 
-        self.aboutArray.append(['Radio Transceiver is :', 'Installed' if self.NRF.ready else 'Not Installed'])
+    def __flush_device_cache__(self):
+        if self.device_cache is not None and self.device_cache_dirty: self.save_device_cache()
 
-        self.DAC = MCP4728(self.H, 3.3, 0)
+    def startup_report(self):
+        """
+		:return: A table of the time (mS) spent on each step of initialization, including the steps that a lazily
+		 initialized instance performed on first use
+		"""
+        rows = ['%-12s %8.2f' % (step, 1e3 * t) for step, t in self.startup_times]
+        rows.append('%-12s %8.2f' % ('total', 1e3 * sum(t for step, t in self.startup_times)))
+        return '\n'.join(rows)
 
     def get_resistance(self):
         V = self.get_average_voltage('SEN')
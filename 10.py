@@ -16,6 +16,9 @@
 		"""
         self.H.__sendByte__(CP.COMMON)
         self.H.__sendByte__(CP.RESTORE_STANDALONE)
+        self.WType = {'W1': None, 'W2': None}
+        self.loaded_tables = {'W1': None, 'W2': None}
+        self.wavegen_registers = {}
 
     def read_flash(self, page, location):
         """
@@ -28,7 +31,9 @@
 		location            The flash location(0 to 63) to read from .
 		================    ============================================================================================
 		:return: a string of 16 characters read from the location
+		Served from self.flash_cache if the whole page has been read before
 		"""
+        if page in self.flash_cache: return self.flash_cache[page][location * 16:location * 16 + 16]
         self.H.__sendByte__(CP.FLASH)
         self.H.__sendByte__(CP.READ_FLASH)
         self.H.__sendByte__(page)  # send the page number. 20 pages with 2K bytes each
@@ -48,18 +53,47 @@
 		numbytes               Total bytes to read
 		================    ============================================================================================
 		:return: a string of 16 characters read from the location
+		Served from self.flash_cache if the whole page has been read before. Reading the whole page fills the cache.
 		"""
+        if page in self.flash_cache: return self.flash_cache[page][:numbytes]
+        return self.__read_flash_page__(page, numbytes)
+
+    def __read_flash_page__(self, page, numbytes=None):
+        """
+		Reads the first `numbytes` of a page (default: all of it) in one bulk transfer, bypassing the cache.
+		A complete page is stored in self.flash_cache.
+		"""
+        numbytes = numbytes or self.FLASH_PAGE_SIZE
         self.H.__sendByte__(CP.FLASH)
         self.H.__sendByte__(CP.READ_BULK_FLASH)
         bytes_to_read = numbytes
         if numbytes % 2: bytes_to_read += 1  # bytes+1 . stuff is stored as integers (byte+byte) in the hardware
         self.H.__sendInt__(bytes_to_read)
         self.H.__sendByte__(page)
-        ss = self.H.fd.read(int(bytes_to_read))
+        ss = self.__read_bulk__(bytes_to_read)
         self.H.__get_ack__()
         if numbytes % 2: return ss[:-1]  # Kill the extra character we read. Don't surprise the user with extra data
+        if numbytes == self.FLASH_PAGE_SIZE:
+            self.flash_cache[page] = ss
+            self.device_cache_dirty = True
         return ss
 
+    def clear_flash_cache(self, page=None):
+        """
+		Forget the cached contents of `page`, or of all pages. Needed only if the flash was written by someone else.
+		"""
+        if page is None: self.flash_cache.clear()
+        else: self.flash_cache.pop(page, None)
+        self.device_cache_dirty = True
+
+    def __forget_flash_page__(self, page):
+        """
+		Drops a page that is about to be written from flash_cache. The device cache file is rewritten first, once,
+		if it may still hold the old contents, so that a crash during the write can not leave them there.
+		"""
+        if self.flash_cache.pop(page, None) is not None: self.device_cache_dirty = True
+        self.__flush_device_cache__()
+
     def write_flash(self, page, location, string_to_write):
         """
 		write a 16 BYTE string to the selected location (0-63)
@@ -76,16 +110,18 @@
 		string_to_write     a string of 16 characters can be written to each location
 		================    ============================================================================================
 		"""
-        while (len(string_to_write) < 16): string_to_write += '.'
+        if isinstance(string_to_write, str): string_to_write = string_to_write.encode('latin-1')
+        string_to_write = bytes(string_to_write).ljust(16, b'.')
+        self.__forget_flash_page__(page)
         self.H.__sendByte__(CP.FLASH)
         self.H.__sendByte__(CP.WRITE_FLASH)  # indicate a flash write coming through
         self.H.__sendByte__(page)  # send the page number. 20 pages with 2K bytes each
         self.H.__sendByte__(location)  # send the location
         self.H.fd.write(string_to_write)
-        time.sleep(0.1)
+        self.__sleep__(0.1)
         self.H.__get_ack__()
 
-    def write_bulk_flash(self, location, data):
+    def write_bulk_flash(self, location, data, verify=True):
         """
 		write a byte array to the entire flash page. Erases any other data
 		DO NOT USE THIS UNLESS YOU'RE ABSOLUTELY SURE YOU KNOW THIS!
@@ -97,24 +133,30 @@
 		**Arguments**
 		================    ============================================================================================
 		location            Block number. 0-20. each block is 2kB.
-		bytearray           Array to dump onto flash. Max size 2048 bytes
+		bytearray           Array to dump onto flash. Max size 2048 bytes. bytes, str or a list of ints
+		verify              read the page back in one transfer and compare it with `data`. default True
 		================    ============================================================================================
+		The payload goes out in a single write. A verified page is kept in self.flash_cache, if it is a full page.
 		"""
-        if (type(data) == str): data = [ord(a) for a in data]
+        if isinstance(data, str): data = data.encode('latin-1')
+        data = bytearray(data)
         if len(data) % 2 == 1: data.append(0)
 
+        self.__forget_flash_page__(location)
         self.H.__sendByte__(CP.FLASH)
         self.H.__sendByte__(CP.WRITE_BULK_FLASH)  # indicate a flash write coming through
         self.H.__sendInt__(len(data))  # send the length
         self.H.__sendByte__(location)
-        for n in range(len(data)):
-            self.H.__sendByte__(data[n])
+        self.__write_bulk__(bytes(data))
         self.H.__get_ack__()
+        if not verify: return
 
-        # verification by readback
-        tmp = [ord(a) for a in self.read_bulk_flash(location, len(data))]
-        print('Verification done', tmp == data)
-        if tmp != data: raise Exception('Verification by readback failed')
+        # verification by readback. This also fills the cache
+        readback = self.__read_flash_page__(location, len(data))
+        if readback != data:
+            self.flash_cache.pop(location, None)
+            raise Exception('Verification by readback failed')
+        self.__print__('Verification done')
 
     # -------------------------------------------------------------------------------------------------------------------#
 
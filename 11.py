@@ -32,45 +32,34 @@ def set_sine1(self, freq):
 		**Arguments**
 		==============  ============================================================================================
 		frequency       Frequency to set on wave generator 1.
-		waveType		'sine','tria' . Default : Do not reload table. and use last set table
+		waveType		'sine','tria', or a shape from WAVEFORMS or WAVEFORM_PRESETS with its default parameters.
+						Default : Do not reload table. and use last set table
 		==============  ============================================================================================
 		:return: frequency
 		"""
         if freq < 0.1:
             self.__print__('freq too low')
             return 0
-        elif freq < 1100:
-            HIGHRES = 1
-            table_size = 512
-        else:
-            HIGHRES = 0
-            table_size = 32
 
-        if waveType:  # User wants to set a particular waveform type. sine or tria
+        if not waveType and self.WType['W1'] is None: waveType = 'sine'  # table unknown. load the default
+        if waveType:  # User wants to set a particular waveform type. sine, tria, or a named shape
             if waveType in ['sine', 'tria']:
                 if (self.WType['W1'] != waveType):
                     self.load_equation('W1', waveType)
+            elif waveType in WAVEFORMS or waveType in WAVEFORM_PRESETS:
+                self.load_equation('W1', waveType)  # not sent again if the device already holds this table
             else:
-                print('Not a valid waveform. try sine or tria')
-
-        p = [1, 8, 64, 256]
-        prescaler = 0
-        while prescaler <= 3:
-            wavelength = int(round(64e6 / freq / p[prescaler] / table_size))
-            freq = (64e6 / wavelength / p[prescaler] / table_size)
-            if wavelength < 65525: break
-            prescaler += 1
-        if prescaler == 4:
+                print('Not a valid waveform. try sine, tria, or a name from WAVEFORMS or WAVEFORM_PRESETS')
+
+        t = timing_for(freq, 'sine')
+        if t.prescaler == 4:
             self.__print__('out of range')
             return 0
 
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SET_SINE1)
-        self.H.__sendByte__(HIGHRES | (prescaler << 1))  # use larger table for low frequencies
-        self.H.__sendInt__(wavelength - 1)
-        self.H.__get_ack__()
-        self.sine1freq = freq
-        return freq
+        # use larger table for low frequencies
+        self.__push_wavegen__(CP.SET_SINE1, 'BH', (t.highres | (t.prescaler << 1), t.wavelength - 1), ['W1'])
+        self.sine1freq = t.frequency
+        return t.frequency
 
     def set_w2(self, freq, waveType=None):
         """
@@ -80,45 +69,33 @@ def set_sine1(self, freq):
 		**Arguments**
 		==============  ============================================================================================
 		frequency       Frequency to set on wave generator 1.
+		waveType		same as for :func:`set_w1`
 		==============  ============================================================================================
 		:return: frequency
 		"""
         if freq < 0.1:
             self.__print__('freq too low')
             return 0
-        elif freq < 1100:
-            HIGHRES = 1
-            table_size = 512
-        else:
-            HIGHRES = 0
-            table_size = 32
 
-        if waveType:  # User wants to set a particular waveform type. sine or tria
+        if not waveType and self.WType['W2'] is None: waveType = 'sine'  # table unknown. load the default
+        if waveType:  # User wants to set a particular waveform type. sine, tria, or a named shape
             if waveType in ['sine', 'tria']:
                 if (self.WType['W2'] != waveType):
                     self.load_equation('W2', waveType)
+            elif waveType in WAVEFORMS or waveType in WAVEFORM_PRESETS:
+                self.load_equation('W2', waveType)  # not sent again if the device already holds this table
             else:
-                print('Not a valid waveform. try sine or tria')
-
-        p = [1, 8, 64, 256]
-        prescaler = 0
-        while prescaler <= 3:
-            wavelength = int(round(64e6 / freq / p[prescaler] / table_size))
-            freq = (64e6 / wavelength / p[prescaler] / table_size)
-            if wavelength < 65525: break
-            prescaler += 1
-        if prescaler == 4:
+                print('Not a valid waveform. try sine, tria, or a name from WAVEFORMS or WAVEFORM_PRESETS')
+
+        t = timing_for(freq, 'sine')
+        if t.prescaler == 4:
             self.__print__('out of range')
             return 0
 
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SET_SINE2)
-        self.H.__sendByte__(HIGHRES | (prescaler << 1))  # use larger table for low frequencies
-        self.H.__sendInt__(wavelength - 1)
-        self.H.__get_ack__()
-        self.sine2freq = freq
-
-        return freq
+        # use larger table for low frequencies
+        self.__push_wavegen__(CP.SET_SINE2, 'BH', (t.highres | (t.prescaler << 1), t.wavelength - 1), ['W2'])
+        self.sine2freq = t.frequency
+        return t.frequency
 
     def readbackWaveform(self, chan):
         """
@@ -159,65 +136,59 @@ def set_sine1(self, freq):
         if freq < 0.1:
             self.__print__('freq1 too low')
             return 0
-        elif freq < 1100:
-            HIGHRES = 1
-            table_size = 512
-        else:
-            HIGHRES = 0
-            table_size = 32
-
         if freq2 < 0.1:
             self.__print__('freq2 too low')
             return 0
-        elif freq2 < 1100:
-            HIGHRES2 = 1
-            table_size2 = 512
-        else:
-            HIGHRES2 = 0
-            table_size2 = 32
         if freq < 1. or freq2 < 1.:
             self.__print__('extremely low frequencies will have reduced amplitudes due to AC coupling restrictions')
+        for a in ['W1', 'W2']:
+            if self.WType[a] is None: self.load_equation(a, 'sine')  # table unknown. load the default
 
-        p = [1, 8, 64, 256]
-        prescaler1 = 0
-        while prescaler1 <= 3:
-            wavelength = int(round(64e6 / freq / p[prescaler1] / table_size))
-            retfreq = (64e6 / wavelength / p[prescaler1] / table_size)
-            if wavelength < 65525: break
-            prescaler1 += 1
-        if prescaler1 == 4:
+        t1 = timing_for(freq, 'sine')
+        if t1.prescaler == 4:
             self.__print__('#1 out of range')
             return 0
-
-        p = [1, 8, 64, 256]
-        prescaler2 = 0
-        while prescaler2 <= 3:
-            wavelength2 = int(round(64e6 / freq2 / p[prescaler2] / table_size2))
-            retfreq2 = (64e6 / wavelength2 / p[prescaler2] / table_size2)
-            if wavelength2 < 65525: break
-            prescaler2 += 1
-        if prescaler2 == 4:
+        t2 = timing_for(freq2, 'sine')
+        if t2.prescaler == 4:
             self.__print__('#2 out of range')
             return 0
 
+        table_size2 = 512 if t2.highres else 32
         phase_coarse = int(table_size2 * (phase) / 360.)
-        phase_fine = int(wavelength2 * (phase - (phase_coarse) * 360. / table_size2) / (360. / table_size2))
+        phase_fine = int(t2.wavelength * (phase - (phase_coarse) * 360. / table_size2) / (360. / table_size2))
 
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SET_BOTH_WG)
+        self.__push_wavegen__(CP.SET_BOTH_WG, 'HHHHB', (
+            t1.wavelength - 1,  # not really wavelength. time between each datapoint
+            t2.wavelength - 1,  # not really wavelength. time between each datapoint
+            phase_coarse,  # table position for phase adjust
+            phase_fine,  # timer delay / fine phase adjust
+            (t2.prescaler << 4) | (t1.prescaler << 2) | (t2.highres << 1) | t1.highres),  # use larger table for low frequencies
+            ['W1', 'W2'])
+        self.sine1freq = t1.frequency
+        self.sine2freq = t2.frequency
 
-        self.H.__sendInt__(wavelength - 1)  # not really wavelength. time between each datapoint
-        self.H.__sendInt__(wavelength2 - 1)  # not really wavelength. time between each datapoint
-        self.H.__sendInt__(phase_coarse)  # table position for phase adjust
-        self.H.__sendInt__(phase_fine)  # timer delay / fine phase adjust
+        return t1.frequency
 
-        self.H.__sendByte__((prescaler2 << 4) | (prescaler1 << 2) | (HIGHRES2 << 1) | (
-            HIGHRES))  # use larger table for low frequencies
+    def __push_wavegen__(self, command, fmt, values, outputs, force=False):
+        """
+		Send a WAVEGEN command with `values` (packed with struct format `fmt`) unless it is exactly what was last sent
+		for every one of `outputs`. self.wavegen_registers remembers the last command and values for each output. An
+		output is forgotten while its command is in flight, so a command that fails is sent again next time.
+		:return: True if the command was sent
+		"""
+        key = (command, tuple(int(a) for a in values))
+        if not force and all(self.wavegen_registers.get(a) == key for a in outputs): return False
+        for a in outputs: self.wavegen_registers.pop(a, None)  # unknown until the command is acknowledged
+        self.H.__sendByte__(CP.WAVEGEN)
+        self.H.__sendByte__(command)
+        for f, v in zip(fmt, key[1]):
+            if f == 'B':
+                self.H.__sendByte__(v)
+            else:
+                self.H.__sendInt__(v)
         self.H.__get_ack__()
-        self.sine1freq = retfreq
-        self.sine2freq = retfreq2
-
-        return retfreq
+        for a in outputs: self.wavegen_registers[a] = key
+        return True
 
     def load_equation(self, chan, function, span=None, **kwargs):
         '''
@@ -227,8 +198,11 @@ def set_sine1(self, freq):
 		**Arguments**
 		==============  ============================================================================================
 		chan             The waveform generator to alter. W1 or W2
-		function            A function that will be used to generate the datapoints
+		function            A function that will be used to generate the datapoints, 'sine', 'tria', or the name of a
+							shape in WAVEFORMS ('square', 'sawtooth', 'chirp', 'harmonics', 'gaussian', 'noise')
+							or of a preset in WAVEFORM_PRESETS
 		span                the range of values in which to evaluate the given function
+		\*\*kwargs          amp, and the parameters of the named shape. eg. duty=0.2 for 'square'
 		==============  ============================================================================================
 		.. code-block:: python
 		  fn = lambda x:abs(x-50)  #Triangular waveform
@@ -236,26 +210,44 @@ def set_sine1(self, freq):
 		  #Load triangular wave to wavegen 1
 		  #Load sinusoidal wave to wavegen 2
 		  self.I.load_waveform('W2',np.sin,[0,2*np.pi])
+		  #Square wave with 20% duty cycle, and the first three odd harmonics of a square wave
+		  self.I.load_equation('W1','square',duty=0.2)
+		  self.I.load_equation('W2','harmonics',amplitudes=[1,0,1/3.,0,1/5.])
 		'''
+        if function in WAVEFORM_PRESETS and 'amp' not in kwargs:
+            kwargs['amp'] = WAVEFORM_PRESETS[function][2]
+        amp = kwargs.get('amp', 0.95)
         if function == 'sine' or function == np.sin:
+            key = ('sine', amp)
             function = np.sin
             span = [0, 2 * np.pi]
-            self.WType[chan] = 'sine'
+            mode = 'sine'
         elif function == 'tria':
+            key = ('tria', amp)
             function = lambda x: abs(x % 4 - 2) - 1
             span = [-1, 3]
-            self.WType[chan] = 'tria'
+            mode = 'tria'
+        elif isinstance(function, str) and (function in WAVEFORMS or function in WAVEFORM_PRESETS):
+            params = {k: v for k, v in kwargs.items() if k not in ('amp', 'force')}
+            key = (function, waveform_params_key(params), amp)
+            self.__print__('reloaded wave equation for %s : %s' % (chan, function))
+            self.__load_wave_table__(chan, function, key, lambda: waveform_points(function, **params), **kwargs)
+            return
         else:
-            self.WType[chan] = 'arbit'
+            key = None
+            mode = 'arbit'
 
-        self.__print__('reloaded wave equation for %s : %s' % (chan, self.WType[chan]))
-        x1 = np.linspace(span[0], span[1], 512 + 1)[:-1]
-        y1 = function(x1)
-        self.load_table(chan, y1, self.WType[chan], **kwargs)
+        self.__print__('reloaded wave equation for %s : %s' % (chan, mode))
+        make_points = lambda: function(np.linspace(span[0], span[1], 512 + 1)[:-1])
+        if key is None:  # arbitrary function. Its output has to be hashed
+            self.load_table(chan, make_points(), mode, **kwargs)
+        else:
+            self.__load_wave_table__(chan, mode, key, make_points, **kwargs)
 
     def load_table(self, chan, points, mode='arbit', **kwargs):
         '''
-		Load an arbitrary waveform table to the waveform generators
+		Load an arbitrary waveform table to the waveform generators.
+		Normalized tables are cached, and a table identical to the one already loaded on `chan` is not sent again.
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
 		==============  ============================================================================================
 		**Arguments**
@@ -263,51 +255,43 @@ def set_sine1(self, freq):
 		chan             The waveform generator to alter. 'W1' or 'W2'
 		points          A list of 512 datapoints exactly
 		mode			Optional argument. Type of waveform. default value 'arbit'. accepts 'sine', 'tria'
+		amp             Optional. Amplitude scaling of the table, 0-1. default 0.95
+		force           Optional. Upload even if the device already holds this table
 		==============  ============================================================================================
 		example::
 		  >>> self.I.load_waveform_table(1,range(512))
 		  #Load sawtooth wave to wavegen 1
 		'''
-        self.__print__('reloaded wave table for %s : %s' % (chan, mode))
-        self.WType[chan] = mode
+        points = np.asarray(points, dtype=float)
+        key = hashlib.sha1(points.tobytes()).hexdigest(), kwargs.get('amp', 0.95)
+        self.__load_wave_table__(chan, mode, key, lambda: points, **kwargs)
+
+    def __load_wave_table__(self, chan, mode, key, make_points, **kwargs):
+        """
+		Upload the table cached as `key` in WAVE_TABLES (built from make_points() on a miss) to `chan`, unless
+		self.loaded_tables says the device already has it.
+		"""
         chans = ['W1', 'W2']
         if chan in chans:
             num = chans.index(chan) + 1
         else:
             print('Channel does not exist. Try W2 or W2')
             return
-
-        # Normalize and scale .
-        # y1 = array with 512 points between 0 and 512
-        # y2 = array with 32 points between 0 and 64
-
-        amp = kwargs.get('amp', 0.95)
-        LARGE_MAX = 511 * amp  # A form of amplitude control. This decides the max PWM duty cycle out of 512 clocks
-        SMALL_MAX = 63 * amp  # Max duty cycle out of 64 clocks
-        y1 = np.array(points)
-        y1 -= min(y1)
-        y1 = y1 / float(max(y1))
-        y1 = 1. - y1
-        y1 = list(np.int16(np.round(LARGE_MAX - LARGE_MAX * y1)))
-
-        y2 = np.array(points[::16])
-        y2 -= min(y2)
-        y2 = y2 / float(max(y2))
-        y2 = 1. - y2
-        y2 = list(np.int16(np.round(SMALL_MAX - SMALL_MAX * y2)))
+        payload, digest = WAVE_TABLES.get(key, make_points, kwargs.get('amp', 0.95))
+        self.WType[chan] = mode
+        if self.loaded_tables[chan] == digest and not kwargs.get('force', False): return
+        self.__print__('reloaded wave table for %s : %s' % (chan, mode))
+        self.loaded_tables[chan] = None  # unknown until the upload is acknowledged
 
         self.H.__sendByte__(CP.WAVEGEN)
         if (num == 1):
             self.H.__sendByte__(CP.LOAD_WAVEFORM1)
         elif (num == 2):
             self.H.__sendByte__(CP.LOAD_WAVEFORM2)
-
-        for a in y1:
-            self.H.__sendInt__(a)
-        for a in y2:
-            self.H.__sendByte__(CP.Byte.pack(a))
-        time.sleep(0.01)
+        self.__write_bulk__(payload)
+        self.__sleep__(0.01)
         self.H.__get_ack__()
+        self.loaded_tables[chan] = digest
 
     def sqr1(self, freq, duty_cycle=50, onlyPrepare=False):
         """
@@ -325,28 +309,19 @@ def set_sine1(self, freq):
             print('Frequency is greater than 10MHz. Please use map_reference_clock for 16 & 32MHz outputs')
             return 0
 
-        p = [1, 8, 64, 256]
-        prescaler = 0
-        while prescaler <= 3:
-            wavelength = int(64e6 / freq / p[prescaler])
-            if wavelength < 65525: break
-            prescaler += 1
-        if prescaler == 4 or wavelength == 0:
+        t = timing_for(freq)
+        if t.prescaler == 4:
             self.__print__('out of range')
             return 0
-        high_time = wavelength * duty_cycle / 100.
-        self.__print__(wavelength, ':', high_time, ':', prescaler)
+        high_time = t.wavelength * duty_cycle / 100.
+        self.__print__(t.wavelength, ':', high_time, ':', t.prescaler)
         if onlyPrepare: self.set_state(SQR1=False)
 
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SET_SQR1)
-        self.H.__sendInt__(int(round(wavelength)))
-        self.H.__sendInt__(int(round(high_time)))
+        prescaler = t.prescaler
         if onlyPrepare: prescaler |= 0x4  # Instruct hardware to prepare the square wave, but do not connect it to the output.
-        self.H.__sendByte__(prescaler)
-        self.H.__get_ack__()
+        self.__push_wavegen__(CP.SET_SQR1, 'HHB', (t.wavelength, int(round(high_time)), prescaler), ['SQR1'])
 
-        self.sqrfreq['SQR1'] = 64e6 / wavelength / p[prescaler & 0x3]
+        self.sqrfreq['SQR1'] = t.frequency
         return self.sqrfreq['SQR1']
 
     def sqr1_pattern(self, timing_array):
@@ -364,14 +339,20 @@ def set_sine1(self, freq):
 			I.sqr1(38e3 , 50, True )   # Prepare a 38KHz, 50% square wave. Do not output it yet
 			I.sqr1_pattern([1000,1000,1000,1000,1000])  #On:1mS (38KHz packet), Off:1mS, On:1mS (38KHz packet), Off:1mS, On:1mS (38KHz packet), Off: indefinitely..
 		"""
+        self.__start_sqr1_pattern__(timing_array)
+        self.__sleep__(sum(timing_array) * 1e-6)  # Sleep for the whole duration
+        return self.__finish_sqr1_pattern__()
+
+    def __start_sqr1_pattern__(self, timing_array):
         self.fill_buffer(self.MAX_SAMPLES / 2, timing_array)  # Load the array to the ADCBuffer(second half)
 
         self.H.__sendByte__(CP.WAVEGEN)
         self.H.__sendByte__(CP.SQR1_PATTERN)
         self.H.__sendInt__(len(timing_array))
-        time.sleep(sum(timing_array) * 1e-6)  # Sleep for the whole duration
-        self.H.__get_ack__()
 
+    def __finish_sqr1_pattern__(self):
+        self.H.__get_ack__()
+        self.wavegen_registers.pop('SQR1', None)
         return True
 
     def sqr2(self, freq, duty_cycle):
@@ -385,27 +366,16 @@ def set_sine1(self, freq):
 		duty_cycle      Percentage of high time
 		==============  ============================================================================================
 		"""
-        p = [1, 8, 64, 256]
-        prescaler = 0
-        while prescaler <= 3:
-            wavelength = 64e6 / freq / p[prescaler]
-            if wavelength < 65525: break
-            prescaler += 1
-
-        if prescaler == 4 or wavelength == 0:
+        t = timing_for(freq)
+        if t.prescaler == 4:
             self.__print__('out of range')
             return 0
 
-        high_time = wavelength * duty_cycle / 100.
-        self.__print__(wavelength, high_time, prescaler)
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SET_SQR2)
-        self.H.__sendInt__(int(round(wavelength)))
-        self.H.__sendInt__(int(round(high_time)))
-        self.H.__sendByte__(prescaler)
-        self.H.__get_ack__()
+        high_time = t.wavelength * duty_cycle / 100.
+        self.__print__(t.wavelength, high_time, t.prescaler)
+        self.__push_wavegen__(CP.SET_SQR2, 'HHB', (t.wavelength, int(round(high_time)), t.prescaler), ['SQR2'])
 
-        self.sqrfreq['SQR2'] = 64e6 / wavelength / p[prescaler & 0x3]
+        self.sqrfreq['SQR2'] = t.frequency
         return self.sqrfreq['SQR2']
 
     def set_sqrs(self, wavelength, phase, high_time1, high_time2, prescaler=1):
@@ -423,14 +393,8 @@ def set_sine1(self, freq):
 		==============  ============================================================================================
 		"""
 
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SET_SQRS)
-        self.H.__sendInt__(wavelength)
-        self.H.__sendInt__(phase)
-        self.H.__sendInt__(high_time1)
-        self.H.__sendInt__(high_time2)
-        self.H.__sendByte__(prescaler)
-        self.H.__get_ack__()
+        self.__push_wavegen__(CP.SET_SQRS, 'HHHHB', (wavelength, phase, high_time1, high_time2, prescaler),
+                              ['SQR1', 'SQR2'])
 
     def sqrPWM(self, freq, h0, p1, h1, p2, h2, p3, h3, **kwargs):
         """
@@ -454,16 +418,12 @@ def set_sine1(self, freq):
             print('Frequency is greater than 10MHz. Please use map_reference_clock for 16 & 32MHz outputs')
             return 0
 
-        p = [1, 8, 64, 256]
-        prescaler = 0
-        while prescaler <= 3:
-            wavelength = int(64e6 / freq / p[prescaler])
-            if wavelength < 65525: break
-            prescaler += 1
-        if prescaler == 4 or wavelength == 0:
+        t = timing_for(freq)
+        if t.prescaler == 4:
             self.__print__('out of range')
             return 0
-
+        wavelength = t.wavelength
+        prescaler = t.prescaler
         if not kwargs.get('pulse', False): prescaler |= (1 << 5)
 
         A1 = int(p1 % 1 * wavelength)
@@ -473,22 +433,12 @@ def set_sine1(self, freq):
         A3 = int(p3 % 1 * wavelength)
         B3 = int((h3 + p3) % 1 * wavelength)
 
-        self.H.__sendByte__(CP.WAVEGEN)
-        self.H.__sendByte__(CP.SQR4)
-        self.H.__sendInt__(wavelength - 1)
-        self.H.__sendInt__(int(wavelength * h0) - 1)
-
-        self.H.__sendInt__(max(0, A1 - 1))
-        self.H.__sendInt__(max(1, B1 - 1))
-        self.H.__sendInt__(max(0, A2 - 1))
-        self.H.__sendInt__(max(1, B2 - 1))
-        self.H.__sendInt__(max(0, A3 - 1))
-        self.H.__sendInt__(max(1, B3 - 1))
-        self.H.__sendByte__(prescaler)
-        self.H.__get_ack__()
+        self.__push_wavegen__(CP.SQR4, 'HHHHHHHHB', (
+            wavelength - 1, int(wavelength * h0) - 1, max(0, A1 - 1), max(1, B1 - 1), max(0, A2 - 1), max(1, B2 - 1),
+            max(0, A3 - 1), max(1, B3 - 1), prescaler), ['SQR1', 'SQR2', 'SQR3', 'SQR4'])
 
-        for a in ['SQR1', 'SQR2', 'SQR3', 'SQR4']: self.sqrfreq[a] = 64e6 / wavelength / p[prescaler & 0x3]
-        return 64e6 / wavelength / p[prescaler & 0x3]
+        for a in ['SQR1', 'SQR2', 'SQR3', 'SQR4']: self.sqrfreq[a] = t.frequency
+        return t.frequency
 
     def map_reference_clock(self, scaler, *args):
         """
@@ -522,6 +472,109 @@ def set_sine1(self, freq):
         self.H.__sendByte__(scaler)
         if 'WAVEGEN' in args: self.DDS_CLOCK = 128e6 / (1 << scaler)
         self.H.__get_ack__()
+        for a in args: self.wavegen_registers.pop(a, None)
+
+    # -------------------------------------------------------------------------------------------------------------------#
+
+    # |=============================================FREQUENCY RESPONSE===================================================|
+    # |Bode plots. W1 drives the circuit, CH1 monitors its input and CH2 its output                                      |
+    # -------------------------------------------------------------------------------------------------------------------#
+
+    def bode_sweep(self, frequencies, cycles=10, max_samples=2000, settle_cycles=5, min_settle=0.02,
+                   tolerance=0.02, retries=2):
+        """
+		Generator that measures the gain and phase of a circuit at each frequency, and yields the results as they
+		are measured. Connect W1 to the input of the circuit and to CH1, and its output to CH2.
+
+		Each capture runs in the background while nothing else is sent. As soon as it completes, W1 is switched to
+		the next frequency, so that the next frequency settles while the current traces are read and analyzed.
+		Amplitude and phase come from a single bin DFT (Goertzel) at the generated frequency over a whole number of
+		cycles. The capture is split in halves, and if their amplitudes differ by more than `tolerance` the circuit
+		had not settled yet, and the point is measured again with a longer settling time.
+
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==============  ============================================================================================
+		**Arguments**
+		==============  ============================================================================================
+		frequencies     array of frequencies to measure (Hz)
+		cycles          number of cycles of each frequency to capture. default 10
+		max_samples     maximum samples per channel and capture. default 2000
+		settle_cycles   cycles to wait after changing the frequency. default 5
+		min_settle      minimum wait after changing the frequency (S). Covers AC coupling. default 20mS
+		tolerance       allowed relative amplitude change between the two halves of a capture. default 2%
+		retries         how many times an unsettled point is measured again. default 2
+		==============  ============================================================================================
+		:yield: dictionary with frequency (as generated by W1), gain, gain_db, phase (degrees, output relative to
+		 input), amplitude_in, amplitude_out (V) and settled (False if the point never settled)
+		>>> for point in I.bode_sweep(np.logspace(1, 4, 200)):
+		...     print(point['frequency'], point['gain_db'], point['phase'])
+		"""
+        plan = solve_timing(np.asarray(frequencies, dtype=float), 'sine')
+        freqs = [f for f, p in zip(plan.frequency, plan.prescaler) if p < 4]
+        if not freqs: return
+        self.set_w1(freqs[0])
+        changed = time.time()
+        for n, f in enumerate(freqs):
+            settle = max(settle_cycles / f, min_settle)
+            for attempt in range(retries + 1):
+                self.__sleep__(max(0, changed + settle - time.time()), idle=True)
+                t = self.__sweep_capture__(f, cycles, max_samples)
+                if n + 1 < len(freqs):
+                    self.set_w1(freqs[n + 1])  # settles while this capture is fetched and analyzed
+                    changed = time.time()
+                y1 = self.oscilloscope.fetch_data('CH1')[:len(t)]
+                y2 = self.oscilloscope.fetch_data('CH2')[:len(t)]
+                point = self.__tone_response__(f, t, y1, y2, tolerance)
+                if point['settled'] or attempt == retries: break
+                settle *= 4  # not settled yet. Measure it again with a longer wait
+                self.set_w1(f)
+                changed = time.time()
+            yield point
+
+    def __sweep_capture__(self, f, cycles, max_samples):
+        """
+		Start a two channel capture of `cycles` periods of `f` with capture_nonblocking, and wait for it to complete.
+		The samples stay on the device until they are read with oscilloscope.fetch_data.
+		:return: sample times (S)
+		"""
+        tg = max(1., np.ceil(8e6 * cycles / f / max_samples) / 8.)  # in 1/8 uS steps, 1uS minimum
+        samples = int(min(max_samples, round(1e6 * cycles / f / tg)))
+        x = self.oscilloscope.capture_nonblocking(2, samples, tg)
+        self.__sleep__(samples * tg * 1e-6)
+        delay = 1e-4
+        while not self.oscilloscope.progress()[0]:
+            self.__sleep__(delay)
+            delay = min(delay * 2, 0.01)
+        return x * 1e-6
+
+    @staticmethod
+    def __tone_response__(f, t, y1, y2, tolerance):
+        """
+		Single bin DFT of both traces at f, for the whole capture and each half of it.
+		"""
+        y = np.vstack((y1, y2))
+        y = y - y.mean(axis=1)[:, None]
+        phasor = np.exp(-2j * np.pi * f * t)
+        half = len(t) // 2
+        bins = np.stack([y.dot(phasor) / len(t), y[:, :half].dot(phasor[:half]) / half,
+                         y[:, half:].dot(phasor[half:]) / (len(t) - half)])  # [whole, first, second] x [in, out]
+        amplitude = 2 * np.abs(bins)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drift = np.abs(amplitude[1] - amplitude[2]) / amplitude[0]
+            gain = amplitude[0, 1] / amplitude[0, 0]
+        phase = np.degrees(np.angle(bins[0, 1] / bins[0, 0]))
+        return {'frequency': f, 'gain': gain, 'gain_db': 20 * np.log10(gain) if gain > 0 else -np.inf,
+                'phase': phase, 'amplitude_in': amplitude[0, 0], 'amplitude_out': amplitude[0, 1],
+                'settled': bool(np.all(drift <= tolerance))}
+
+    def bode_plot(self, frequencies, **kwargs):
+        """
+		Runs :func:`bode_sweep` to completion.
+		:return: dictionary of arrays with the keys of the points yielded by bode_sweep
+		"""
+        points = list(self.bode_sweep(frequencies, **kwargs))
+        keys = ['frequency', 'gain', 'gain_db', 'phase', 'amplitude_in', 'amplitude_out', 'settled']
+        return {k: np.array([p[k] for p in points]) for k in keys}
 
     # -------------------------------------------------------------------------------------------------------------------#
 
@@ -731,7 +784,7 @@ def set_sine1(self, freq):
         self.H.__sendInt__((steps << 1) | direction)
         self.H.__sendInt__(delay)
 
-        time.sleep(steps * delay * 1e-3)  # convert mS to S
+        self.__sleep__(steps * delay * 1e-3)  # convert mS to S
 
     def stepForward(self, steps, delay):
         """
@@ -814,7 +867,7 @@ def set_sine1(self, freq):
         self.H.__sendByte__(1 if persist else 0)
         self.H.__sendInt__(int(round(((64e6 / baudrate) / 4) - 1)))
         self.__print__('BRGVAL:', int(round(((64e6 / baudrate) / 4) - 1)))
-        time.sleep(0.1)
+        self.__sleep__(0.1)
         self.__print__('junk bytes read:', len(self.H.fd.read(100)))
 
     def estimateDistance(self):
@@ -885,7 +938,7 @@ def set_sine1(self, freq):
         self.timebase = SS
         self.samples = samples
         self.channels_in_buffer = 1
-        time.sleep(2 * delay * 1e-6)
+        self.__sleep__(2 * delay * 1e-6)
         self.H.__get_ack__()
 
     def setUARTBAUD(self, BAUD):
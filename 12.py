@@ -0,0 +1,453 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |==============================================COMMAND PIPELINING==================================================|
+# |Helpers that let many ScienceLab calls share a single write and a single read on the serial port                |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class _BatchHandler(object):
+    """
+	Stands in for ScienceLab.H while a batch is being flushed.
+	In recording mode (replies=None) every read returns zeros, so that the size of each reply can be tallied. In
+	replay mode reads are served from `replies`. Outgoing bytes are collected in both modes, and never sent.
+	Anything else is delegated to the real handler.
+	"""
+
+    def __init__(self, H, replies=None):
+        self._H = H
+        self.fd = self
+        self.commands = bytearray()
+        self.reply_size = 0
+        self.replies = replies
+        self.offset = 0
+
+    def __getattr__(self, name):
+        return getattr(self._H, name)
+
+    def write(self, data):
+        self.commands += data
+
+    def read(self, n):
+        n = int(n)
+        if self.replies is None:
+            self.reply_size += n
+            return bytes(n)
+        ss = bytes(self.replies[self.offset:self.offset + n])
+        self.offset += n
+        return ss
+
+    def readline(self):
+        raise RuntimeError('readline can not be batched')
+
+    def flush(self):
+        pass
+
+    @property
+    def in_waiting(self):
+        return 0 if self.replies is None else len(self.replies) - self.offset
+
+    def waitForData(self, timeout=0.2):
+        return True
+
+    def __sendByte__(self, value):
+        self.write(value if isinstance(value, (bytes, bytearray)) else CP.Byte.pack(value))
+
+    def __sendInt__(self, value):
+        self.write(CP.ShortInt.pack(int(value)))
+
+    def __getByte__(self):
+        return CP.Byte.unpack(self.read(1))[0]
+
+    def __getInt__(self):
+        return CP.ShortInt.unpack(self.read(2))[0]
+
+    def __getLong__(self):
+        return CP.Integer.unpack(self.read(4))[0]
+
+    def __get_ack__(self):
+        return CP.Byte.unpack(self.read(1))[0]
+
+
+class Batch(object):
+    """
+	Returned by :func:`ScienceLab.batch`. Method calls are queued and answered with a Future.
+	On flush, every queued call is first run on a sandbox: a copy of the instance whose handler records the command
+	bytes and the size of each reply, and reads zeros. Nothing the recording does (caches, gains, flash pages, the
+	device cache, callbacks) reaches the real instance. The combined commands go out in one write, all replies come
+	back in one read, and each call is then run once on the real instance against its own slice of the replies.
+	A call whose replay sends other bytes, or reads another amount, than its recording did depends on the reply
+	contents (e.g. get_voltage while autoranging, get_capacitance). Its Future gets a RuntimeError, and the calls
+	after it are unaffected. Its commands have reached the device, so state it caches may be out of date.
+	ScienceLab.__sleep__ does nothing while a call is recorded or replayed, since all commands are sent together.
+	"""
+    DETACHED = ('device_cache', 'autorange_callback')  # attributes the sandbox must not use at all
+    COPIED = ('gains', 'wavegen_registers', 'loaded_tables', 'WType', 'sqrfreq', 'flash_cache', 'capacitance_fixtures',
+              'buff', 'LA_timestamps', 'LA_fetched', 'LA_points', 'LA_unwrap', 'aboutArray', 'startup_times')
+    # containers that ScienceLab methods change in place. The sandbox gets deep copies, and shares everything else
+
+    def __init__(self, I):
+        self.I = I
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.I, name)
+        if not callable(method): return method
+
+        def queue(*args, **kwargs):
+            f = Future()
+            self.calls.append((name, args, kwargs, f))
+            return f
+
+        return queue
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            for name, args, kwargs, f in self.calls: f.cancel()
+            self.calls = []
+
+    def flush(self):
+        calls, self.calls = self.calls, []
+        if not calls: return
+        with self.I.lock:
+            self.__flush__(calls)
+
+    def __sandbox__(self, recorder):
+        """
+		Copy of self.I whose state can be changed freely, talking to `recorder` wherever self.I talks to self.I.H.
+		Only the containers listed in COPIED, and the objects that hold the handler (oscilloscope, peripherals), are
+		deep-copied. The logic analyzer channels only ever have their attributes reassigned, so a shallow copy of
+		each will do. All other attributes are reassigned rather than changed in place, and are shared.
+		"""
+        I = self.I
+        sandbox = copy.copy(I)
+        memo = {id(I): sandbox, id(I.H): recorder}
+        state = sandbox.__dict__
+        for name, value in I.__dict__.items():
+            if name in self.COPIED or any(a is I.H for a in getattr(value, '__dict__', {}).values()):
+                state[name] = copy.deepcopy(value, memo)
+        state['H'] = recorder
+        state['dchans'] = [copy.copy(a) for a in I.dchans]
+        for name in self.DETACHED: state[name] = None
+        return sandbox
+
+    def __flush__(self, calls):
+        H = self.I.H
+        recorder = _BatchHandler(H)
+        sandbox = self.__sandbox__(recorder)
+        planned = []
+        for name, args, kwargs, f in calls:
+            mark = len(recorder.commands), recorder.reply_size
+            try:
+                getattr(sandbox, name)(*args, **kwargs)
+            except Exception as e:
+                del recorder.commands[mark[0]:]
+                recorder.reply_size = mark[1]
+                f.set_exception(e)
+                continue
+            planned.append((name, args, kwargs, f, mark, (len(recorder.commands), recorder.reply_size)))
+
+        H.fd.write(bytes(recorder.commands))
+        replies = self.I.__read_bulk__(recorder.reply_size) if recorder.reply_size else b''
+
+        try:
+            for name, args, kwargs, f, (c0, r0), (c1, r1) in planned:
+                self.I.H = player = _BatchHandler(H, replies[r0:r1])
+                try:
+                    result = getattr(self.I, name)(*args, **kwargs)
+                    if player.commands != recorder.commands[c0:c1] or player.offset != r1 - r0:
+                        raise RuntimeError('%s depends on the replies of the device, and can not be batched' % name)
+                    f.set_result(result)
+                except Exception as e:
+                    f.set_exception(e)
+        finally:
+            self.I.H = H
+
+
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |===============================================ASYNCIO FRONT-END==================================================|
+# |Awaitable access to a ScienceLab instance for programs running inside an asyncio event loop                      |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class AsyncScienceLab(object):
+    """
+	Awaitable front-end for :class:`ScienceLab`.
+	Every device transaction is submitted to an internal command queue that is drained by a single worker task,
+	so any number of coroutines may share one device. Calls that wait on the hardware (get_freq, r2r_time, f2f_time,
+	capture_edges1, get_capacitance, sqr1_pattern) run the phases of the ScienceLab method in the default executor,
+	wait between them with asyncio.sleep or by polling the serial port, and release the queue between polls wherever
+	the protocol allows it. All other ScienceLab methods are available as coroutines that run the blocking call in the
+	default executor. No serial I/O runs on the event loop thread.
+	>>> A = AsyncScienceLab(I)
+	>>> freq = await A.get_freq('ID1')
+	>>> volts = await A.get_voltage('CH1')
+	"""
+    POLL_INTERVAL = 1e-3
+    MAX_POLL_INTERVAL = 0.05
+
+    def __init__(self, I=None, **kwargs):
+        self.I = I if I is not None else connect(**kwargs)
+        self._queue = None
+        self._worker = None
+
+    def __getattr__(self, name):
+        method = getattr(self.I, name)
+        if not callable(method): return method
+
+        async def call(*args, **kwargs):
+            return await self._submit(functools.partial(self._in_executor, method, *args, **kwargs))
+
+        return call
+
+    async def _in_executor(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    async def _submit(self, job):
+        """
+		Queue a coroutine function that needs exclusive use of the device, and wait for its result.
+		"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.ensure_future(self._run())
+        f = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, f))
+        return await f
+
+    async def _run(self):
+        while True:
+            job, f = await self._queue.get()
+            if f.cancelled(): continue
+            try:
+                result = await job()
+                if not f.done(): f.set_result(result)
+            except Exception as e:
+                if not f.done(): f.set_exception(e)
+
+    async def close(self):
+        """
+		Stop the command queue worker.
+		"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _wait_for_data(self, timeout):
+        """
+		Non-blocking replacement for Handler.waitForData. Polls the port with an increasing interval.
+		"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        delay = self.POLL_INTERVAL
+        while loop.time() - start < timeout:
+            if self.I.H.fd.in_waiting: return True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_POLL_INTERVAL)
+        return bool(self.I.H.fd.in_waiting)
+
+    async def get_freq(self, channel='CNTR', timeout=2):
+        """
+		Awaitable version of :func:`ScienceLab.get_freq`
+		"""
+        I = self.I
+
+        async def job():
+            await self._in_executor(I.__start_freq__, channel, timeout)
+            await self._wait_for_data(timeout)
+            return await self._in_executor(I.__read_freq__)
+
+        return await self._submit(job)
+
+    async def _edge_time(self, channel, channel_mode, skip_cycle, timeout):
+        I = self.I
+        if timeout > 60: timeout = 60
+
+        def poll():
+            states = I.__LA_ready__(skip_cycle + 2)
+            if states is None: return None
+            return I.__read_edge_time__(states, skip_cycle)
+
+        await self._submit(functools.partial(self._in_executor, I.start_one_channel_LA, channel=channel,
+                                             channel_mode=channel_mode, trigger_mode=0))
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        delay = self.POLL_INTERVAL
+        while loop.time() - start_time < timeout:
+            result = await self._submit(functools.partial(self._in_executor, poll))
+            if result is not None: return result
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_POLL_INTERVAL)
+        return []
+
+    async def r2r_time(self, channel, skip_cycle=0, timeout=5):
+        """
+		Awaitable version of :func:`ScienceLab.r2r_time`
+		"""
+        return await self._edge_time(channel, 3, skip_cycle, timeout)
+
+    async def f2f_time(self, channel, skip_cycle=0, timeout=5):
+        """
+		Awaitable version of :func:`ScienceLab.f2f_time`
+		"""
+        return await self._edge_time(channel, 2, skip_cycle, timeout)
+
+    async def capture_edges1(self, waiting_time=1., **args):
+        """
+		Awaitable version of :func:`ScienceLab.capture_edges1`. The device is free for other calls while waiting.
+		"""
+        I = self.I
+        await self._submit(functools.partial(self._in_executor, I.__start_edges1__, **args))
+        await asyncio.sleep(waiting_time)
+        return await self._submit(functools.partial(self._in_executor, I.__fetch_edges1__))
+
+    async def get_capacitance(self):
+        """
+		Awaitable version of :func:`ScienceLab.get_capacitance`
+		"""
+        I = self.I
+
+        def measure(CR, CT):
+            async def job():
+                await self._in_executor(I.__start_capacitance__, CR, 0, CT)
+                await asyncio.sleep(CT * 1e-6 + .02)
+                return await self._in_executor(I.__read_capacitance__, CR, 0, CT)
+
+            return job
+
+        steps = I.__capacitance_steps__()
+        try:
+            request = next(steps)
+            while True:
+                if request == 'RC':
+                    reply = await self._submit(functools.partial(self._in_executor, I.capacitance_via_RC_discharge))
+                else:
+                    reply = await self._submit(measure(*request))
+                request = steps.send(reply)
+        except StopIteration as e:
+            return e.value
+
+    async def sqr1_pattern(self, timing_array):
+        """
+		Awaitable version of :func:`ScienceLab.sqr1_pattern`
+		"""
+        I = self.I
+
+        async def job():
+            await self._in_executor(I.__start_sqr1_pattern__, timing_array)
+            await asyncio.sleep(sum(timing_array) * 1e-6)
+            return await self._in_executor(I.__finish_sqr1_pattern__)
+
+        return await self._submit(job)
+
+
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |==============================================THREAD-SAFE ACCESS==================================================|
+# |A dedicated I/O thread with a priority queue that owns all traffic to one device                                 |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class DeviceWorker(object):
+    """
+	I/O thread used by :func:`ScienceLab.threadsafe`. Submitted calls are queued with a priority (lower runs first,
+	ties run in submission order) and executed one at a time while holding the device lock, so the bytes of two
+	transactions can never interleave on the serial port.
+	A long call releases the device while it waits with no reply pending (see :func:`idle`). Queued calls of the same
+	or a higher priority run in that time. Waits inside a transaction, while the device owes a reply (the charge time
+	of get_capacitance, the pattern of sqr1_pattern), still hold the device.
+	"""
+
+    def __init__(self, I):
+        self.I = I
+        self.queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._wakeup = threading.Event()
+        self.running = []  # priorities of the calls in progress. Nested ones are run from idle()
+        self.thread = threading.Thread(target=self._run, name='PSLab I/O')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, priority, fn, *args, **kwargs):
+        f = Future()
+        if threading.current_thread() is self.thread:  # nested call from a running job. run it directly
+            try:
+                f.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                f.set_exception(e)
+        else:
+            self.queue.put((priority, next(self._order), fn, args, kwargs, f))
+            self._wakeup.set()
+        return f
+
+    def idle(self, seconds):
+        """
+		Wait for `seconds`. Called from a running call, at a point where the device owes it no reply. Queued calls
+		whose priority is not lower than that of the running call are executed meanwhile, so the wait may overrun
+		by the duration of the last of them. Outside the worker thread, this is time.sleep.
+		"""
+        if threading.current_thread() is not self.thread: return time.sleep(seconds)
+        deadline = time.time() + seconds
+        while True:
+            self._wakeup.clear()
+            with self.queue.mutex:  # the stop request has an infinite priority, and is never run from here
+                ready = bool(self.queue.queue) and self.queue.queue[0][0] <= self.running[-1]
+            if ready: self._execute(self.queue.get())
+            remaining = deadline - time.time()
+            if remaining <= 0: return
+            if not ready: self._wakeup.wait(remaining)
+
+    def call(self, priority, fn, *args, **kwargs):
+        return self.submit(priority, fn, *args, **kwargs).result()
+
+    def stop(self):
+        self.queue.put((float('inf'), next(self._order), None, None, None, None))
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job[2] is None: break
+            self._execute(job)
+
+    def _execute(self, job):
+        priority, n, fn, args, kwargs, f = job
+        if not f.set_running_or_notify_cancel(): return
+        self.running.append(priority)
+        try:
+            with self.I.lock:
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            f.set_exception(e)
+        else:
+            f.set_result(result)
+        finally:
+            self.running.pop()
+
+
+class ThreadSafeScienceLab(object):
+    """
+	Proxy returned by :func:`ScienceLab.threadsafe`. Attribute reads go straight to the ScienceLab instance, method
+	calls are run on its I/O worker with this proxy's priority and block until they complete.
+	"""
+
+    def __init__(self, I, priority=1):
+        self.I = I
+        self.priority = priority
+
+    def __getattr__(self, name):
+        method = getattr(self.I, name)
+        if not callable(method): return method
+
+        def call(*args, **kwargs):
+            worker = self.I.worker
+            if worker is None:
+                raise RuntimeError('the I/O worker was stopped. Call threadsafe() again to restart it')
+            return worker.call(self.priority, method, *args, **kwargs)
+
+        return call
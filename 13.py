@@ -0,0 +1,517 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |===============================================SIMULATED DEVICE===================================================|
+# |A software PSLab that speaks the commands_proto protocol, for benchmarking and testing without hardware.         |
+# |Use ScienceLab(simulate=True, latency=..., bandwidth=...)                                                         |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class SimulatedSerial(object):
+    """
+	Stand-in for the serial port of a PSLab. Bytes written to it are parsed as commands_proto commands and the
+	replies are queued for reading, exactly as the firmware would send them.
+	.. tabularcolumns:: |p{3cm}|p{11cm}|
+	==============  ============================================================================================
+	**Arguments**
+	==============  ============================================================================================
+	latency         seconds added to the first read after a write (one USB round trip). default 0
+	bandwidth       bytes per second for both directions. default None (unlimited)
+	analog          dict of {chosa: f(t)} returning raw 12-bit ADC codes. Defaults to sine waves around mid-scale
+	digital_freqs   frequencies of the square waves seen on the digital inputs, in digital_channel_names order
+	capacitance     capacitor connected to CAP, in Farads. default 1e-9
+	seed            seed for the ADC noise generator
+	==============  ============================================================================================
+	Commands the simulator does not know are dropped, and reads that find no pending reply are padded with zeros.
+	Traffic counters are kept in self.stats.
+	"""
+    CH2_CHOSA = 0  # CAPTURE_TWO samples the requested input and CH2
+
+    def __init__(self, latency=0, bandwidth=None, analog=None, digital_freqs=None, capacitance=1e-9, seed=0,
+                 **kwargs):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.analog = analog or {}
+        self.digital_freqs = digital_freqs or [1000., 2000., 500., 250., 1000., 1000., 1000.]
+        self.capacitance = capacitance
+        self.timeout = kwargs.get('timeout', 1.0)
+        self.rng = np.random.RandomState(seed)
+        self.MAX_SAMPLES = CP.MAX_SAMPLES
+        self.buffer = np.zeros(self.MAX_SAMPLES, dtype=np.uint16)
+        self.flash = {}
+        self.program_memory = {0x800FF8: 0x5053, 0x800FFA: 0x4C42, 0x800FFC: 0x0005, 0x800FFE: (0x1D4C + seed) & 0xFFFF}
+        self.registers = {}
+        self.state = 0
+        self.cap_state = (0, 0.)
+        self.count_start = None
+        self.LA = None
+        self.streaming = None
+        self.start_time = time.time()
+
+        self._input = bytearray()
+        self._output = bytearray()
+        self._last_was_write = False
+        self.stats = {}
+        self.reset_stats()
+        self.commands = self.__command_table__()
+
+    def reset_stats(self):
+        self.stats.update({'writes': 0, 'reads': 0, 'bytes_written': 0, 'bytes_read': 0, 'round_trips': 0})
+
+    # ----------------------------------serial port interface----------------------------------
+
+    def write(self, data):
+        data = bytes(data)
+        self.stats['writes'] += 1
+        self.stats['bytes_written'] += len(data)
+        if not self._last_was_write:
+            del self._input[:]  # Anything left unparsed by the previous exchange was an unknown command.
+        self._last_was_write = True
+        self.__delay__(len(data))
+        self._input += data
+        self.__parse__()
+        return len(data)
+
+    def read(self, n=1):
+        n = int(n)
+        self.stats['reads'] += 1
+        self.stats['bytes_read'] += n
+        if self._last_was_write:
+            self.stats['round_trips'] += 1
+            self.__delay__(n, self.latency)
+        else:
+            self.__delay__(n)
+        self._last_was_write = False
+        if self.streaming: self.__stream__(n)
+        ss = bytes(self._output[:n])
+        del self._output[:n]
+        return ss + bytes(n - len(ss))
+
+    def readline(self):
+        n = self._output.find(b'\n') + 1
+        return self.read(n if n else len(self._output))
+
+    @property
+    def in_waiting(self):
+        if self.streaming: self.__stream__(1)
+        return len(self._output)
+
+    def inWaiting(self):
+        return self.in_waiting
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __delay__(self, nbytes, latency=0):
+        t = latency + (float(nbytes) / self.bandwidth if self.bandwidth else 0)
+        if t > 0: time.sleep(t)
+
+    # ---------------------------------------command parser------------------------------------
+
+    def __command_table__(self):
+        """
+		Maps (header, command) to (argument struct format, extra payload length(args) or None, handler(args, payload))
+		"""
+        b = lambda x: CP.Byte.unpack(x)[0]
+        no_payload = None
+        return {
+            (b(CP.ADC), b(CP.GET_VOLTAGE_SUMMED)): ('B', no_payload, self.__voltage_summed__),
+            (b(CP.ADC), b(CP.START_ADC_STREAMING)): ('BH', no_payload, self.__start_streaming__),
+            (b(CP.ADC), b(CP.SET_CAP)): ('BH', no_payload, self.__set_cap__),
+            (b(CP.ADC), b(CP.CAPTURE_DMASPEED)): ('BHH', no_payload, self.__capture__),
+            (b(CP.ADC), b(CP.CAPTURE_TWO)): ('BHH', no_payload, self.__capture_two__),
+            (b(CP.ADC), b(CP.GET_CAPTURE_STATUS)): ('', no_payload, self.__capture_status__),
+            (b(CP.ADC), b(CP.MULTIPOINT_CAPACITANCE)): ('BHH', no_payload, self.__capture_discharge__),
+            (b(CP.COMMON), b(CP.RETRIEVE_BUFFER)): ('HH', no_payload, self.__retrieve_buffer__),
+            (b(CP.COMMON), b(CP.CLEAR_BUFFER)): ('HH', no_payload, self.__clear_buffer__),
+            (b(CP.COMMON), b(CP.FILL_BUFFER)): ('HH', lambda a: 2 * a[1], self.__fill_buffer__),
+            (b(CP.COMMON), b(CP.GET_FREQUENCY)): ('HB', no_payload, self.__get_frequency__),
+            (b(CP.COMMON), b(CP.GET_HIGH_FREQUENCY)): ('B', no_payload, self.__get_high_frequency__),
+            (b(CP.COMMON), b(CP.GET_ALTERNATE_HIGH_FREQUENCY)): ('B', no_payload, self.__get_high_frequency__),
+            (b(CP.COMMON), b(CP.READ_PROGRAM_ADDRESS)): ('HH', no_payload, self.__read_program_address__),
+            (b(CP.COMMON), b(CP.GET_CAPACITANCE)): ('BBH', no_payload, self.__get_capacitance__),
+            (b(CP.COMMON), b(CP.GET_CAP_RANGE)): ('H', no_payload, self.__get_cap_range__),
+            (b(CP.COMMON), b(CP.GET_CTMU_VOLTAGE)): ('B', no_payload, self.__get_ctmu_voltage__),
+            (b(CP.COMMON), b(CP.SET_RGB1)): ('B', lambda a: a[0], self.__ack__),
+            (b(CP.COMMON), b(CP.SET_RGB2)): ('B', lambda a: a[0], self.__ack__),
+            (b(CP.COMMON), b(CP.SET_RGB3)): ('B', lambda a: a[0], self.__ack__),
+            (b(CP.COMMON), b(CP.START_COUNTING)): ('B', no_payload, self.__start_counting__),
+            (b(CP.COMMON), b(CP.FETCH_COUNT)): ('', no_payload, self.__fetch_count__),
+            (b(CP.COMMON), b(CP.GET_VERSION)): ('', no_payload, self.__get_version__),
+            (b(CP.COMMON), b(CP.READ_LOG)): ('', no_payload, self.__read_log__),
+            (b(CP.TIMING), b(CP.START_ALTERNATE_ONE_CHAN_LA)): ('HBB', no_payload, self.__start_one_channel_LA__),
+            (b(CP.TIMING), b(CP.START_TWO_CHAN_LA)): ('HBBB', no_payload, self.__start_two_channel_LA__),
+            (b(CP.TIMING), b(CP.START_THREE_CHAN_LA)): ('HHB', no_payload, self.__start_three_channel_LA__),
+            (b(CP.TIMING), b(CP.START_FOUR_CHAN_LA)): ('HHBB', no_payload, self.__start_four_channel_LA__),
+            (b(CP.TIMING), b(CP.STOP_LA)): ('', no_payload, self.__stop_LA__),
+            (b(CP.TIMING), b(CP.GET_INITIAL_DIGITAL_STATES)): ('', no_payload, self.__initial_digital_states__),
+            (b(CP.TIMING), b(CP.FETCH_INT_DMA_DATA)): ('HB', no_payload, self.__fetch_int_dma__),
+            (b(CP.TIMING), b(CP.FETCH_LONG_DMA_DATA)): ('HB', no_payload, self.__fetch_long_dma__),
+            (b(CP.DIN), b(CP.GET_STATES)): ('', no_payload, self.__get_states__),
+            (b(CP.DOUT), b(CP.SET_STATE)): ('B', no_payload, self.__set_state__),
+            (b(CP.WAVEGEN), b(CP.SET_SINE1)): ('BH', no_payload, self.__register__('SINE1')),
+            (b(CP.WAVEGEN), b(CP.SET_SINE2)): ('BH', no_payload, self.__register__('SINE2')),
+            (b(CP.WAVEGEN), b(CP.SET_BOTH_WG)): ('HHHHB', no_payload, self.__register__('BOTH_WG')),
+            (b(CP.WAVEGEN), b(CP.LOAD_WAVEFORM1)): ('', lambda a: 512 * 2 + 32, self.__register__('WAVEFORM1')),
+            (b(CP.WAVEGEN), b(CP.LOAD_WAVEFORM2)): ('', lambda a: 512 * 2 + 32, self.__register__('WAVEFORM2')),
+            (b(CP.WAVEGEN), b(CP.SET_SQR1)): ('HHB', no_payload, self.__register__('SQR1')),
+            (b(CP.WAVEGEN), b(CP.SET_SQR2)): ('HHB', no_payload, self.__register__('SQR2')),
+            (b(CP.WAVEGEN), b(CP.SET_SQRS)): ('HHHHB', no_payload, self.__register__('SQRS')),
+            (b(CP.WAVEGEN), b(CP.SQR4)): ('HHHHHHHHB', no_payload, self.__register__('SQR4')),
+            (b(CP.WAVEGEN), b(CP.SQR1_PATTERN)): ('H', no_payload, self.__register__('SQR1_PATTERN')),
+            (b(CP.WAVEGEN), b(CP.MAP_REFERENCE)): ('BB', no_payload, self.__register__('MAP_REFERENCE')),
+            (b(CP.FLASH), b(CP.READ_FLASH)): ('BB', no_payload, self.__read_flash__),
+            (b(CP.FLASH), b(CP.READ_BULK_FLASH)): ('HB', no_payload, self.__read_bulk_flash__),
+            (b(CP.FLASH), b(CP.WRITE_FLASH)): ('BB', lambda a: 16, self.__write_flash__),
+            (b(CP.FLASH), b(CP.WRITE_BULK_FLASH)): ('HB', lambda a: a[0], self.__write_bulk_flash__),
+        }
+
+    def __parse__(self):
+        while self._input:
+            if self.streaming:
+                if self._input[0] == CP.Byte.unpack(CP.STOP_STREAMING)[0]:
+                    self.streaming = None
+                del self._input[:1]
+                continue
+            if len(self._input) < 2: return
+            spec = self.commands.get((self._input[0], self._input[1]))
+            if spec is None:
+                del self._input[:1]  # unknown header. drop it
+                continue
+            fmt, payload, handler = spec
+            fmt = '<' + fmt
+            size = struct.calcsize(fmt)
+            if len(self._input) < 2 + size: return
+            args = struct.unpack(fmt, bytes(self._input[2:2 + size]))
+            extra = payload(args) if payload else 0
+            if len(self._input) < 2 + size + extra: return
+            data = bytes(self._input[2 + size:2 + size + extra])
+            del self._input[:2 + size + extra]
+            reply = handler(args, data)
+            if reply: self._output += reply
+
+    # ---------------------------------------signal models-------------------------------------
+
+    def now(self):
+        return time.time() - self.start_time
+
+    def adc_code(self, chosa, t):
+        """
+		Raw 12-bit ADC code on analog input `chosa` at time(s) t
+		"""
+        fn = self.analog.get(chosa)
+        if fn is not None:
+            code = fn(t)
+        else:
+            code = 2048 + 1000 * np.sin(2 * np.pi * 50 * np.asarray(t) + chosa)
+        return np.clip(np.round(code + self.rng.normal(0, 1, np.shape(t))), 0, 4095).astype(np.uint16)
+
+    def digital_state(self, chan, t):
+        return (t * self.digital_freqs[chan]) % 1 < 0.5
+
+    def edges(self, chan, mode, t0, t1, limit):
+        """
+		Timestamps(s, relative to t0) of the edges recorded in acquisition `mode` on digital input `chan`
+		"""
+        f = self.digital_freqs[chan]
+        step = {1: 0.5, 2: 1., 3: 1., 4: 4., 5: 16.}.get(mode)
+        if step is None: return np.zeros(0)
+        offset = 0.5 if mode == 2 else 0.  # falling edges lie half a period after rising edges
+        first = np.floor(t0 * f / step - offset / step) + 1
+        last = np.floor(t1 * f / step - offset / step)
+        n = int(min(max(last - first + 1, 0), limit))
+        return (first + np.arange(n)) * step / f + offset / f - t0
+
+    # ---------------------------------------command handlers----------------------------------
+
+    def __ack__(self, args=None, data=None):
+        return CP.ACKNOWLEDGE
+
+    def __register__(self, name):
+        def handler(args, data):
+            self.registers[name] = data if data else args
+            return CP.ACKNOWLEDGE
+
+        return handler
+
+    def __voltage_summed__(self, args, data):
+        t = self.now() + np.arange(16) * 1e-6
+        return CP.ShortInt.pack(int(self.adc_code(args[0], t).sum()) & 0xFFFF) + CP.ACKNOWLEDGE
+
+    def __start_streaming__(self, args, data):
+        self.streaming = {'chosa': args[0], 'tg': args[1] / 8e6, 'time': self.now()}
+
+    def __stream__(self, n):
+        """
+		Generate the 8-bit samples streamed since the last call. Samples that do not fit into the 4 kB transmit
+		buffer of the simulated port are lost, as they would be on hardware.
+		"""
+        s = self.streaming
+        count = int((self.now() - s['time']) / s['tg'])
+        room = max(n, 4096) - len(self._output)
+        if count <= 0: return
+        t = s['time'] + np.arange(min(count, max(room, 0))) * s['tg']
+        s['time'] += count * s['tg']
+        self._output += (self.adc_code(s['chosa'], t) >> 4).astype(np.uint8).tobytes()
+
+    def __set_cap__(self, args, data):
+        self.cap_state = (args[0], self.now() + args[1] * 1e-6)
+        return CP.ACKNOWLEDGE
+
+    def __capture__(self, args, data):
+        chosa, samples, tg = args[0] & 0x7F, args[1], args[2] / 8e6
+        t = self.now() + np.arange(samples) * tg
+        self.buffer[:samples] = self.adc_code(chosa, t)
+        self.capture_status = samples
+        return CP.ACKNOWLEDGE
+
+    def __capture_two__(self, args, data):
+        chosa, samples, tg = args[0] & 0x7F, args[1], args[2] / 8e6
+        t = self.now() + np.arange(samples) * tg
+        for n, c in enumerate((chosa, self.CH2_CHOSA)):  # 10-bit samples, one block per channel
+            self.buffer[n * samples:(n + 1) * samples] = self.adc_code(c, t) >> 2
+        self.capture_status = samples
+        return CP.ACKNOWLEDGE
+
+    def __capture_discharge__(self, args, data):
+        samples, tg = args[1], args[2] / 8e6
+        V0 = 3.3 if self.cap_state[0] else 0.
+        t = np.arange(samples) * tg
+        V = V0 * np.exp(-t / (1e4 * (self.capacitance + 42e-12)))
+        code = V / 3.3 * 4095 + self.rng.normal(0, 1, samples)
+        self.buffer[:samples] = np.clip(np.round(code), 0, 4095).astype(np.uint16)
+        self.capture_status = samples
+        return CP.ACKNOWLEDGE
+
+    def __capture_status__(self, args, data):
+        return CP.Byte.pack(1) + CP.ShortInt.pack(getattr(self, 'capture_status', 0)) + CP.ACKNOWLEDGE
+
+    def __retrieve_buffer__(self, args, data):
+        start, n = args
+        return self.buffer[start:start + n].astype('<u2').tobytes() + CP.ACKNOWLEDGE
+
+    def __clear_buffer__(self, args, data):
+        start, n = args
+        self.buffer[start:start + n] = 0
+        return CP.ACKNOWLEDGE
+
+    def __fill_buffer__(self, args, data):
+        start, n = args
+        self.buffer[start:start + n] = np.frombuffer(data, dtype='<u2')
+        return CP.ACKNOWLEDGE
+
+    def __get_frequency__(self, args, data):
+        f = self.digital_freqs[args[1]] if args[1] < len(self.digital_freqs) else 0
+        start = int(self.now() * 64e6) & 0xFFFFFFFF
+        return (CP.Byte.pack(0) + CP.Integer.pack(start) +
+                CP.Integer.pack((start + int(16 * 64e6 / f)) & 0xFFFFFFFF) + CP.ACKNOWLEDGE)
+
+    def __get_high_frequency__(self, args, data):
+        f = self.digital_freqs[args[0]] if args[0] < len(self.digital_freqs) else 0
+        return CP.Byte.pack(1) + CP.Integer.pack(int(f * 0.1)) + CP.ACKNOWLEDGE
+
+    def __read_program_address__(self, args, data):
+        return CP.ShortInt.pack(self.program_memory.get(args[0] | (args[1] << 16), 0)) + CP.ACKNOWLEDGE
+
+    def __get_capacitance__(self, args, data):
+        current = [0.55e-3, 0.55e-6, 0.55e-5, 0.55e-4][args[0] & 3]
+        V = min(current * args[2] * 1e-6 / (self.capacitance + 42e-12), 3.3)
+        return CP.ShortInt.pack(int(V / 3.3 * 4095)) + CP.ACKNOWLEDGE
+
+    def __get_cap_range__(self, args, data):
+        V = 3.3 * (1 - np.exp(-args[0] * 1e-6 / (1e4 * (self.capacitance + 42e-12))))
+        return CP.ShortInt.pack(int(16 * V / 3.3 * 4095)) + CP.ACKNOWLEDGE
+
+    def __get_ctmu_voltage__(self, args, data):
+        return CP.ShortInt.pack(16 * 800) + CP.ACKNOWLEDGE
+
+    def __start_counting__(self, args, data):
+        self.count_start = (args[0], self.now())
+        return CP.ACKNOWLEDGE
+
+    def __fetch_count__(self, args, data):
+        count = 0
+        if self.count_start:
+            chan, t0 = self.count_start
+            count = len(self.edges(chan, 3, t0, self.now(), 0xFFFF))
+        return CP.ShortInt.pack(count) + CP.ACKNOWLEDGE
+
+    def __get_version__(self, args, data):
+        return b'PSLab V5 (simulated)\n'
+
+    def __read_log__(self, args, data):
+        return b'\n' + CP.ACKNOWLEDGE
+
+    def __get_states__(self, args, data):
+        t = self.now()
+        s = 0
+        for a in range(4):
+            if self.digital_state(a, t): s |= 1 << a
+        return CP.Byte.pack(s) + CP.ACKNOWLEDGE
+
+    def __set_state__(self, args, data):
+        mask = args[0] >> 4
+        self.state = (self.state & ~mask) | (args[0] & mask)
+        return CP.ACKNOWLEDGE
+
+    # Logic analyzer. Every channel records into its own slot of the ADC buffer, just like the DMA in the firmware.
+    # 'int' channels use slot k (ints at k*MAX_SAMPLES/4). 'long' channels use slot 2k (ints at k*MAX_SAMPLES/2).
+
+    def __start_LA__(self, channels, datatype, prescaler=0):
+        self.LA = {'time': self.now(), 'channels': channels, 'datatype': datatype, 'prescaler': prescaler,
+                   'states': sum(1 << a for a in range(4) if self.digital_state(a, self.now()))}
+        return CP.ACKNOWLEDGE
+
+    def __start_one_channel_LA__(self, args, data):
+        return self.__start_LA__([(args[1] >> 4, args[1] & 0xF)], 'long')
+
+    def __start_two_channel_LA__(self, args, data):
+        modes, chans = args[2], args[3]
+        return self.__start_LA__([(chans & 0xF, modes & 0xF), (chans >> 4, modes >> 4)], 'long')
+
+    def __start_three_channel_LA__(self, args, data):
+        return self.__start_LA__([(a, (args[1] >> (4 * a)) & 0xF) for a in range(3)], 'int')
+
+    def __start_four_channel_LA__(self, args, data):
+        return self.__start_LA__([(a, (args[1] >> (4 * a)) & 0xF) for a in range(4)], 'int', args[2])
+
+    def __stop_LA__(self, args, data):
+        self.__update_LA__()
+        if self.LA: self.LA['stopped'] = True
+        return CP.ACKNOWLEDGE
+
+    def __update_LA__(self):
+        """
+		Writes every edge recorded so far into the ADC buffer, and returns the number of edges per slot.
+		"""
+        counts = [0, 0, 0, 0]
+        LA = self.LA
+        if not LA: return counts
+        if 'stopped' in LA: return LA['counts']
+        limit = self.MAX_SAMPLES // 4
+        for n, (chan, mode) in enumerate(LA['channels']):
+            t = self.edges(chan, mode, LA['time'], self.now(), limit)
+            if LA['datatype'] == 'long':
+                ticks = np.round(t * 64e6).astype(np.uint32)
+                start = n * self.MAX_SAMPLES // 2
+                self.buffer[start:start + 2 * len(ticks)] = ticks.view('<u2')
+                counts[2 * n] = len(ticks)
+            else:
+                ticks = (np.round(t * 64e6 / [1, 8, 64, 256][LA['prescaler'] & 3]).astype(np.uint64) & 0xFFFF)
+                start = n * self.MAX_SAMPLES // 4
+                self.buffer[start:start + len(ticks)] = ticks
+                counts[n] = len(ticks)
+        LA['counts'] = counts
+        return counts
+
+    def __initial_digital_states__(self, args, data):
+        counts = self.__update_LA__()
+        initial = 0x1000
+        reply = CP.ShortInt.pack(initial)
+        for a in range(4):
+            reply += CP.ShortInt.pack(initial + 2 * (counts[a] + a * self.MAX_SAMPLES // 4))
+        states = self.LA['states'] if self.LA else 0
+        return reply + CP.Byte.pack(states) + CP.Byte.pack(0) + CP.ACKNOWLEDGE
+
+    def __fetch_int_dma__(self, args, data):
+        self.__update_LA__()
+        n, chan = args
+        start = chan * self.MAX_SAMPLES // 4
+        return self.buffer[start:start + n].astype('<u2').tobytes() + CP.ACKNOWLEDGE
+
+    def __fetch_long_dma__(self, args, data):
+        self.__update_LA__()
+        n, chan = args
+        start = chan * self.MAX_SAMPLES // 2
+        return self.buffer[start:start + 2 * n].astype('<u2').tobytes() + CP.ACKNOWLEDGE
+
+    # Flash. 2 kB pages, erased state 0xFF
+
+    def __page__(self, page):
+        if page not in self.flash: self.flash[page] = bytearray(b'\xff' * 2048)
+        return self.flash[page]
+
+    def __read_flash__(self, args, data):
+        page, location = args
+        return bytes(self.__page__(page)[location * 16:location * 16 + 16]) + CP.ACKNOWLEDGE
+
+    def __read_bulk_flash__(self, args, data):
+        n, page = args
+        return bytes(self.__page__(page)[:n]) + CP.ACKNOWLEDGE
+
+    def __write_flash__(self, args, data):
+        page, location = args
+        self.__page__(page)[location * 16:location * 16 + 16] = data
+        return CP.ACKNOWLEDGE
+
+    def __write_bulk_flash__(self, args, data):
+        n, page = args
+        self.flash[page] = bytearray(data) + bytearray(b'\xff' * (2048 - len(data)))
+        return CP.ACKNOWLEDGE
+
+
+class SimulatedHandler(object):
+    """
+	Drop-in replacement for packet_handler.Handler that talks to a :class:`SimulatedSerial` device.
+	Keyword arguments are passed on to SimulatedSerial.
+	"""
+
+    def __init__(self, **kwargs):
+        self.fd = SimulatedSerial(**kwargs)
+        self.connected = True
+        self.portname = kwargs.get('port', 'simulated')
+        self.version_string = self.get_version()
+
+    def __sendByte__(self, value):
+        if isinstance(value, (bytes, bytearray)):
+            self.fd.write(value)
+        else:
+            self.fd.write(CP.Byte.pack(int(value)))
+
+    def __sendInt__(self, value):
+        self.fd.write(CP.ShortInt.pack(int(value)))
+
+    def __getByte__(self):
+        return CP.Byte.unpack(self.fd.read(1))[0]
+
+    def __getInt__(self):
+        return CP.ShortInt.unpack(self.fd.read(2))[0]
+
+    def __getLong__(self):
+        return CP.Integer.unpack(self.fd.read(4))[0]
+
+    def __get_ack__(self):
+        return CP.Byte.unpack(self.fd.read(1))[0]
+
+    # the names used by the instrument classes of newer PSL releases (e.g. PSL.oscilloscope)
+    send_byte = __sendByte__
+    send_int = __sendInt__
+    get_byte = __getByte__
+    get_int = __getInt__
+    get_long = __getLong__
+    get_ack = __get_ack__
+
+    def read(self, n):
+        return self.fd.read(n)
+
+    def write(self, data):
+        self.fd.write(data)
+
+    def waitForData(self, timeout=0.2):
+        start = time.time()
+        while time.time() - start < timeout:
+            if self.fd.in_waiting: return True
+            time.sleep(0.001)
+        return False
+
+    def get_version(self):
+        self.__sendByte__(CP.COMMON)
+        self.__sendByte__(CP.GET_VERSION)
+        return self.fd.readline().decode().strip()
+
+    def reconnect(self, **kwargs):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
@@ -0,0 +1,125 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |===============================================BENCHMARKS=========================================================|
+# |Timing and traffic counts for the transport hot paths. Runs against the simulated device by default.             |
+# -------------------------------------------------------------------------------------------------------------------#
+
+BENCHMARK_FLASH_PAGE = 19  # scratch page used by the flash benchmarks. Never run those on hardware you care about.
+
+
+def __benchmark_cases__(I, size):
+    """
+	Returns a list of (name, callable) for every benchmarked entry point. `size` scales the amount of data moved.
+	"""
+    points = np.arange(size) % 4096
+    table = 512 + 511 * np.sin(np.linspace(0, 2 * np.pi, 512, endpoint=False))
+    flash_data = [a & 0xFF for a in range(2048)]
+    leds = [[a & 0xFF, (2 * a) & 0xFF, (3 * a) & 0xFF] for a in range(80)]
+    fit_t = np.arange(500) * 80e-6
+    fit_y = 3.3 * np.exp(-fit_t / 10e-3) + np.random.RandomState(0).normal(0, 1e-3, 500)
+    return [
+        ('get_average_voltage', lambda: I.get_average_voltage('CH1', samples=min(size, 1000))),
+        ('fetch_buffer', lambda: I.fetch_buffer(0, size)),
+        ('fill_buffer', lambda: I.fill_buffer(0, points)),
+        ('fetch_int_data_from_LA', lambda: I.fetch_int_data_from_LA(min(size, I.MAX_SAMPLES // 4), 1)),
+        ('fetch_long_data_from_LA', lambda: I.fetch_long_data_from_LA(min(size, I.MAX_SAMPLES // 4), 1)),
+        ('load_table', lambda: I.load_table('W1', table, force=True)),
+        ('write_bulk_flash', lambda: I.write_bulk_flash(BENCHMARK_FLASH_PAGE, list(flash_data))),
+        ('read_bulk_flash', lambda: I.clear_flash_cache() or I.read_bulk_flash(BENCHMARK_FLASH_PAGE, 2048)),
+        ('WS2812B', lambda: I.WS2812B(leds)),
+        ('device_id', lambda: I.device_id()),
+        ('fit_exponential', lambda: fit_exponential(fit_t, fit_y)),
+        ('capacitance_via_RC_discharge', lambda: I.capacitance_via_RC_discharge()),
+    ]
+
+
+def run_benchmarks(I=None, names=None, repeat=20, size=5000, baseline=None, output=None, tolerance=0.1, **kwargs):
+    """
+	Time the main ScienceLab entry points, and count the serial traffic each of them generates.
+	.. tabularcolumns:: |p{3cm}|p{11cm}|
+	==============  ============================================================================================
+	**Arguments**
+	==============  ============================================================================================
+	I               ScienceLab instance. default: a new simulated device created with **kwargs
+	names           list of benchmarks to run. default: all of them
+	repeat          calls per benchmark. default 20
+	size            number of points moved by the buffer and logic analyzer benchmarks. default 5000
+	baseline        results from an earlier run (dict, or path to its JSON file) to compare against
+	output          path to write the results to, as JSON
+	tolerance       fractional slowdown tolerated before a benchmark is flagged as a regression. default 0.1
+	==============  ============================================================================================
+	:return: dictionary with a 'results' entry per benchmark containing ops_per_s, p50_ms, p99_ms and the
+	 per-call writes, reads, bytes_written, bytes_read and round_trips (traffic counts need a simulated device).
+	 If a baseline was given, a 'comparison' entry holds the speedup of each benchmark and a list of regressions.
+	Flash benchmarks overwrite page BENCHMARK_FLASH_PAGE, so they only run on simulated devices unless
+	explicitly named.
+	>>> r = run_benchmarks(latency=1e-3, bandwidth=1e5, output='bench.json')
+	>>> run_benchmarks(latency=1e-3, bandwidth=1e5, baseline='bench.json')['comparison']['regressions']
+	[]
+	"""
+    if I is None:
+        kwargs.setdefault('simulate', True)
+        I = ScienceLab(**kwargs)
+    simulated = isinstance(I.H, SimulatedHandler)
+    stats = getattr(I.H.fd, 'stats', None)
+
+    results = {}
+    for name, fn in __benchmark_cases__(I, int(size)):
+        if names is not None and name not in names: continue
+        if names is None and 'flash' in name and not simulated: continue
+        times = []
+        counters = dict(stats) if stats is not None else None
+        try:
+            for a in range(int(repeat)):
+                t = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - t)
+        except Exception as e:
+            results[name] = {'error': '%s: %s' % (type(e).__name__, e)}
+            continue
+        times = np.array(times)
+        result = {'calls': len(times),
+                  'ops_per_s': len(times) / times.sum() if times.sum() else float('inf'),
+                  'p50_ms': float(np.percentile(times, 50) * 1e3),
+                  'p99_ms': float(np.percentile(times, 99) * 1e3)}
+        if counters is not None:
+            for key in counters:
+                result[key] = (stats[key] - counters[key]) / float(len(times))
+        results[name] = result
+
+    report = {'device': I.H.version_string if hasattr(I.H, 'version_string') else I.H.get_version(),
+              'simulated': simulated, 'repeat': int(repeat), 'size': int(size), 'results': results}
+    if simulated:
+        report['latency'] = I.H.fd.latency
+        report['bandwidth'] = I.H.fd.bandwidth
+
+    if baseline is not None:
+        if not isinstance(baseline, dict):
+            with open(baseline) as f:
+                baseline = json.load(f)
+        report['comparison'] = compare_benchmarks(report, baseline, tolerance)
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return report
+
+
+def compare_benchmarks(report, baseline, tolerance=0.1):
+    """
+	Compare two run_benchmarks reports.
+	:return: {'speedup': {name: new ops_per_s / old ops_per_s}, 'round_trips': {name: (old, new)}, 'regressions': [names]}
+	A benchmark regresses if it got slower by more than `tolerance`, or needs more round trips per call than before.
+	"""
+    comparison = {'speedup': {}, 'round_trips': {}, 'regressions': []}
+    for name, new in report['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old or 'error' in old or 'error' in new: continue
+        speedup = float(new['ops_per_s']) / old['ops_per_s'] if old['ops_per_s'] else float('inf')
+        comparison['speedup'][name] = speedup
+        regressed = speedup < 1 - tolerance
+        if 'round_trips' in old and 'round_trips' in new:
+            comparison['round_trips'][name] = (old['round_trips'], new['round_trips'])
+            regressed |= new['round_trips'] > old['round_trips']
+        if regressed: comparison['regressions'].append(name)
+    return comparison
@@ -0,0 +1,130 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |=================================================ADC STREAMING====================================================|
+# |Background reader for start_streaming. Samples are drained into a preallocated ring buffer                       |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class ADCStream(object):
+    """
+	Created by :func:`ScienceLab.start_streaming`. A daemon thread drains the 8-bit samples streamed by the ADC
+	from the serial port into a ring buffer of `capacity` samples. The device lock is held only around each read,
+	so :func:`ScienceLab.stop_streaming` can be called from any thread, including through threadsafe() and batch().
+
+	Every sample has an absolute index counted from the start of the stream, and its timestamp is index*dt.
+	If the consumer falls more than `capacity` samples behind, the oldest unread samples are overwritten and
+	counted in stats['overflows'].
+
+	.. code-block:: python
+
+		stream = I.start_streaming(tg=80, channel='CH1')
+		while logging:
+			t, v = stream.read_voltages(timeout=0.5)
+		I.stop_streaming()
+	"""
+
+    def __init__(self, I, tg, channel, capacity=1 << 22, read_size=1 << 14, poll_interval=1e-3):
+        self.I = I
+        self.channel = channel
+        self.dt = tg / 8e6
+        self.capacity = int(capacity)
+        self.read_size = int(read_size)
+        self.poll_interval = poll_interval
+        self.buffer = np.zeros(self.capacity, dtype=np.uint8)
+        ch = I.oscilloscope._channels[channel]
+        ch.resolution = 8
+        self.table = np.asarray(ch.scale(np.arange(256)), dtype=float)  # raw 8-bit code -> voltage
+        self.head = 0  # absolute index of the next sample to be written
+        self.tail = 0  # absolute index of the next sample to be read
+        self.stats = {'samples': 0, 'reads': 0, 'overflows': 0, 'max_backlog': 0, 'started': time.time()}
+        self._stopping = threading.Event()
+        self._data = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='PSLab stream')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        fd = self.I.H.fd
+        while not self._stopping.is_set():
+            if not self.I.lock.acquire(timeout=0.1): continue
+            try:
+                waiting = fd.in_waiting
+                if waiting:
+                    self.stats['max_backlog'] = max(self.stats['max_backlog'], waiting)
+                    self._store(fd.read(min(waiting, self.read_size, self.capacity)))
+            finally:
+                self.I.lock.release()
+            if not waiting:
+                time.sleep(self.poll_interval)
+
+    def _store(self, ss):
+        n = len(ss)
+        if not n: return
+        data = np.frombuffer(ss, dtype=np.uint8)
+        start = self.head % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        self.buffer[:n - first] = data[first:]
+        with self._data:
+            self.head += n
+            if self.head - self.tail > self.capacity:
+                self.stats['overflows'] += self.head - self.tail - self.capacity
+                self.tail = self.head - self.capacity
+            self.stats['samples'] = self.head
+            self.stats['reads'] += 1
+            self._data.notify_all()
+
+    @property
+    def running(self):
+        return self.thread.is_alive()
+
+    @property
+    def available(self):
+        """
+		Number of samples received but not yet read
+		"""
+        return self.head - self.tail
+
+    def __slice__(self, start, stop):
+        """
+		Raw samples with absolute indices start..stop. A view into the ring buffer unless the range wraps around.
+		"""
+        a, b = start % self.capacity, stop % self.capacity
+        if stop - start == 0: return self.buffer[:0]
+        if a < b or b == 0: return self.buffer[a:b or self.capacity]
+        return np.concatenate((self.buffer[a:], self.buffer[:b]))
+
+    def read(self, n=None, timeout=None):
+        """
+		Returns (index, raw) for up to `n` unread samples (all of them by default), waiting up to `timeout` seconds
+		for data to arrive. `raw` is a view into the ring buffer when possible, so copy it if you intend to keep it
+		for longer than `capacity` samples. `index` is the absolute index of raw[0].
+		"""
+        with self._data:
+            if not self.available and timeout:
+                self._data.wait(timeout)
+            start = self.tail
+            stop = self.head if n is None else min(self.head, start + int(n))
+            self.tail = stop
+        return start, self.__slice__(start, stop)
+
+    def read_voltages(self, n=None, timeout=None):
+        """
+		Same as :func:`read`, but returns (timestamps, voltages) as float arrays
+		"""
+        start, raw = self.read(n, timeout)
+        return (start + np.arange(len(raw))) * self.dt, self.table[raw]
+
+    def latest(self, n):
+        """
+		Returns (timestamps, voltages) of the `n` most recent samples, without consuming them
+		"""
+        stop = self.head
+        start = max(stop - min(int(n), self.capacity), 0)
+        return (start + np.arange(stop - start)) * self.dt, self.table[self.__slice__(start, stop)]
+
+    def stop(self, timeout=1.0):
+        self._stopping.set()
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            raise RuntimeError('stream reader did not stop within %g s' % timeout)
+        self.stats['stopped'] = time.time()
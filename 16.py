@@ -0,0 +1,190 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |================================================RECORDING TO DISK=================================================|
+# |Append-only sessions of (time, value) series stored as memory mapped .npy chunks plus a JSON index              |
+# -------------------------------------------------------------------------------------------------------------------#
+
+RECORD_DTYPE = np.dtype([('t', '<f8'), ('v', '<f4')])
+
+
+class Recorder(object):
+    """
+	Records acquisitions into the directory `path`. Each named series is stored as a sequence of fixed size .npy
+	chunks that are written through np.memmap, so memory use stays flat and appending costs the same at any length.
+	index.json lists the chunks of every series with their time span, and is rewritten whenever a chunk fills up.
+	If `path` already holds a recording, it is appended to in new chunks, with the chunk_size it was recorded with.
+	Open the result with :class:`RecordedSession`.
+
+	.. code-block:: python
+
+		with Recorder('run1') as rec:
+			stream = I.start_streaming(tg=80, channel='CH1')
+			rec.record_stream(stream, duration=3600)
+			I.stop_streaming()
+			I.start_four_channel_LA(); time.sleep(1)
+			rec.record_LA(I)
+	"""
+
+    def __init__(self, path, chunk_size=1 << 20):
+        self.path = path
+        self.chunk_size = int(chunk_size)
+        if not os.path.isdir(path): os.makedirs(path)
+        index = os.path.join(path, 'index.json')
+        if os.path.exists(index):  # continue an existing session. New chunks are numbered after the recorded ones
+            with open(index) as f:
+                self.index = json.load(f)
+            self.chunk_size = int(self.index['chunk_size'])
+        elif any(f.endswith('.npy') for f in os.listdir(path)):
+            raise ValueError('%s holds chunk files but no index.json. Use an empty directory' % path)
+        else:
+            self.index = {'version': 1, 'chunk_size': self.chunk_size, 'series': {}}
+        self.open_chunks = {}  # name -> (memmap, chunk metadata)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, name, t, v):
+        """
+		Append samples to series `name`. `t` holds timestamps in seconds, in increasing order, `v` the values.
+		"""
+        t = np.asarray(t, dtype=float)
+        v = np.broadcast_to(np.asarray(v, dtype=np.float32), t.shape)
+        done = 0
+        while done < len(t):
+            chunk, meta = self.__chunk__(name)
+            n = min(len(t) - done, self.chunk_size - meta['count'])
+            rows = chunk[meta['count']:meta['count'] + n]
+            rows['t'] = t[done:done + n]
+            rows['v'] = v[done:done + n]
+            if meta['count'] == 0: meta['t0'] = float(t[done])
+            meta['count'] += n
+            meta['t1'] = float(t[done + n - 1])
+            done += n
+            if meta['count'] == self.chunk_size: self.__close_chunk__(name)
+
+    def __chunk__(self, name):
+        if name not in self.open_chunks:
+            chunks = self.index['series'].setdefault(name, [])
+            meta = {'file': '%s.%05d.npy' % (name, len(chunks)), 'count': 0, 't0': None, 't1': None}
+            chunks.append(meta)
+            chunk = np.lib.format.open_memmap(os.path.join(self.path, meta['file']), mode='w+',
+                                              dtype=RECORD_DTYPE, shape=(self.chunk_size,))
+            self.open_chunks[name] = (chunk, meta)
+        return self.open_chunks[name]
+
+    def __close_chunk__(self, name):
+        chunk, meta = self.open_chunks.pop(name)
+        chunk.flush()
+        del chunk
+        self.__write_index__()
+
+    def __write_index__(self):
+        tmp = os.path.join(self.path, 'index.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, 'index.json'))
+
+    def flush(self):
+        for chunk, meta in self.open_chunks.values():
+            chunk.flush()
+        self.__write_index__()
+
+    def close(self):
+        for name in list(self.open_chunks):
+            self.__close_chunk__(name)
+        self.__write_index__()
+
+    def record_stream(self, stream, duration=None, name=None, timeout=0.5):
+        """
+		Move the samples of an :class:`ADCStream` to disk until `duration` seconds of data have been recorded,
+		or until the stream stops. Series name defaults to the streamed channel.
+		"""
+        name = name or stream.channel
+        end = None if duration is None else stream.head * stream.dt + duration
+        while stream.running or stream.available:
+            t, v = stream.read_voltages(timeout=timeout)
+            if end is not None and len(t) and t[-1] >= end:
+                keep = np.searchsorted(t, end)
+                self.append(name, t[:keep], v[:keep])
+                break
+            self.append(name, t, v)
+
+    def record_LA(self, I, t0=0, prefix=''):
+        """
+		Fetch the logic analyzer channels of ScienceLab `I`, and append the timestamps (converted from uS to
+		seconds and offset by `t0`) of every channel that recorded data. Values are the channel numbers.
+		"""
+        I.fetch_LA_channels()
+        for a in I.dchans:
+            if a.dlength:
+                self.append(prefix + a.name, t0 + a.timestamps[:a.dlength] * 1e-6, a.channel_number)
+
+
+class RecordedSession(object):
+    """
+	Read-only view of a directory written by :class:`Recorder`. Opening only reads index.json, and series are
+	memory mapped chunk by chunk as they are sliced.
+	>>> s = RecordedSession('run1')
+	>>> t, v = s['CH1'].time_range(10, 10.5)
+	"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            self.index = json.load(f)
+
+    @property
+    def names(self):
+        return list(self.index['series'])
+
+    def __getitem__(self, name):
+        return RecordedSeries(self.path, self.index['series'][name])
+
+
+class RecordedSeries(object):
+    """
+	One series of a :class:`RecordedSession`. Supports len(), integer slicing (returns an array of records with
+	fields 't' and 'v') and time_range().
+	"""
+
+    def __init__(self, path, chunks):
+        self.path = path
+        self.chunks = [c for c in chunks if c['count']]
+        self.offsets = np.cumsum([0] + [c['count'] for c in self.chunks])
+        self._maps = {}
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __chunk__(self, n):
+        if n not in self._maps:
+            self._maps[n] = np.load(os.path.join(self.path, self.chunks[n]['file']), mmap_mode='r')
+        return self._maps[n][:self.chunks[n]['count']]
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice): key = slice(key, key + 1 if key != -1 else None)
+        start, stop, step = key.indices(len(self))
+        if stop <= start: return np.zeros(0, dtype=RECORD_DTYPE)
+        first = np.searchsorted(self.offsets, start, side='right') - 1
+        last = np.searchsorted(self.offsets, stop, side='left')
+        parts = [self.__chunk__(n)[max(start - self.offsets[n], 0):stop - self.offsets[n]]
+                 for n in range(first, last)]
+        rows = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return rows[::step]
+
+    def time_range(self, t0=None, t1=None):
+        """
+		Returns (t, v) for the samples with t0 <= t < t1. Only the chunks overlapping the range are opened.
+		"""
+        parts = []
+        for n, c in enumerate(self.chunks):
+            if (t1 is not None and c['t0'] >= t1) or (t0 is not None and c['t1'] < t0): continue
+            rows = self.__chunk__(n)
+            a = 0 if t0 is None else np.searchsorted(rows['t'], t0, side='left')
+            b = len(rows) if t1 is None else np.searchsorted(rows['t'], t1, side='left')
+            parts.append(rows[a:b])
+        rows = np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+        return np.array(rows['t']), np.array(rows['v'])
@@ -0,0 +1,163 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |=================================================DEVICE GROUPS====================================================|
+# |Run the same call on many PSLabs at once                                                                          |
+# -------------------------------------------------------------------------------------------------------------------#
+
+PSLAB_USB_IDS = [(0x04D8, 0x00DF), (0x10C4, 0xEA60)]  # (VID, PID) of the PSLab v5 and v6 USB bridges
+PSLAB_VERSIONS = ('PSLab', 'CSpark')  # a PSLab's version string contains one of these
+
+
+class DeviceGroup(object):
+    """
+	A fleet of ScienceLab instances that are driven together. Every call made on the group is sent to all devices
+	concurrently from a thread pool, so a fleet-wide measurement takes about as long as the slowest device.
+	Results come back as a dictionary keyed by each device's hexid.
+	.. tabularcolumns:: |p{3cm}|p{11cm}|
+	==============  ============================================================================================
+	**Arguments**
+	==============  ============================================================================================
+	devices         Optional list of ScienceLab instances to use
+	ports           Optional list of serial ports to open. Default: every attached PSLab found by discover()
+	max_workers     size of the thread pool. Default: one thread per device
+	\\*\\*kwargs      passed on to every ScienceLab that is opened
+	==============  ============================================================================================
+	>>> G = DeviceGroup()
+	>>> G.get_voltage('CH1')
+	{'0x50534c4200051d4c': 1.002, '0x50534c4200051d4d': 0.998}
+	>>> G.set_waves(1000)
+	>>> G.stats['0x50534c4200051d4c']['mean']
+	0.0012
+	"""
+
+    def __init__(self, devices=None, ports=None, max_workers=None, **kwargs):
+        if devices is None:
+            devices = self.open(self.discover() if ports is None else ports, **kwargs)
+        self.devices = {}
+        for I in devices:
+            key = I.hexid or I.H.portname
+            if key in self.devices: key = '%s@%s' % (key, I.H.portname)
+            self.devices[key] = I
+        self.pool = ThreadPoolExecutor(max_workers or max(len(self.devices), 1))
+        self.stats = {key: {'calls': 0, 'total': 0., 'mean': 0., 'last': 0., 'max': 0.} for key in self.devices}
+
+    @staticmethod
+    def discover():
+        """
+		:return: the serial ports of every attached PSLab. Ports are picked by USB vendor and product IDs, and each
+		 one is kept only if it answers :func:`handshake`. 10C4:EA60 is the ID of every CP210x bridge, so the ID alone
+		 also matches unrelated serial devices.
+		"""
+        from serial.tools import list_ports
+        ports = sorted(p.device for p in list_ports.comports() if (p.vid, p.pid) in PSLAB_USB_IDS)
+        with ThreadPoolExecutor(max(len(ports), 1)) as pool:
+            versions = list(pool.map(DeviceGroup.handshake, ports))
+        return [port for port, version in zip(ports, versions) if version]
+
+    @staticmethod
+    def handshake(port, timeout=1.):
+        """
+		Ask the device on `port` for its version string. Only the GET_VERSION command is sent, so a device that is
+		not a PSLab receives nothing else.
+		:return: the version string, or '' if the port can not be opened or the reply is not from a PSLab
+		"""
+        import serial
+        try:
+            with serial.Serial(port, 1000000, timeout=timeout, write_timeout=timeout) as fd:
+                fd.reset_input_buffer()
+                fd.write(CP.COMMON + CP.GET_VERSION)
+                version = fd.readline().decode('utf-8', 'replace').strip()
+        except (serial.SerialException, OSError):
+            return ''
+        return version if any(name in version for name in PSLAB_VERSIONS) else ''
+
+    @staticmethod
+    def open(ports, **kwargs):
+        """
+		Connect to all `ports` concurrently. Ports that fail to connect, or whose device does not report a PSLab
+		version string, are skipped.
+		:return: list of ScienceLab instances
+		"""
+        def attempt(port):
+            try:
+                I = ScienceLab(port=port, **kwargs)
+            except Exception as e:
+                print('Could not connect to %s : %s' % (port, e))
+                return None
+            if not I.connected: return None
+            version = getattr(I.H, 'version_string', None) or I.get_version()
+            if not any(name in version for name in PSLAB_VERSIONS):
+                print('%s is not a PSLab : %s' % (port, version))
+                I.H.disconnect()
+                return None
+            return I
+
+        with ThreadPoolExecutor(max(len(ports), 1)) as pool:
+            return [I for I in pool.map(attempt, ports) if I is not None]
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __getitem__(self, hexid):
+        return self.devices[hexid]
+
+    def __getattr__(self, name):
+        if name.startswith('__') or not self.__dict__.get('devices'): raise AttributeError(name)
+
+        def broadcast(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+
+        return broadcast
+
+    def __timed__(self, key, name, args, kwargs):
+        I = self.devices[key]
+        start = time.perf_counter()
+        with I.lock:  # also guards self.stats[key] against concurrent calls on the same group
+            result = getattr(I, name)(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            s = self.stats[key]
+            s['calls'] += 1
+            s['total'] += elapsed
+            s['mean'] = s['total'] / s['calls']
+            s['last'] = elapsed
+            s['max'] = max(s['max'], elapsed)
+        return result
+
+    def call(self, name, *args, **kwargs):
+        """
+		Run method `name` on every device in parallel.
+		Pass return_exceptions=True to get exceptions back as results instead of having the first one re-raised.
+		:return: {hexid: result}
+		"""
+        return_exceptions = kwargs.pop('return_exceptions', False)
+        futures = {key: self.pool.submit(self.__timed__, key, name, args, kwargs) for key in self.devices}
+        results = {}
+        for key, f in futures.items():
+            try:
+                results[key] = f.result()
+            except Exception as e:
+                if not return_exceptions: raise
+                results[key] = e
+        return results
+
+    async def call_async(self, name, *args, **kwargs):
+        """
+		Awaitable version of :func:`call`. The devices are driven from the same thread pool.
+		"""
+        return_exceptions = kwargs.pop('return_exceptions', False)
+        loop = asyncio.get_running_loop()
+        keys = list(self.devices)
+        results = await asyncio.gather(
+            *[loop.run_in_executor(self.pool, self.__timed__, key, name, args, kwargs) for key in keys],
+            return_exceptions=return_exceptions)
+        return dict(zip(keys, results))
+
+    def close(self):
+        """
+		Waits for pending calls, then stops each device's I/O worker and closes its serial port.
+		"""
+        self.pool.shutdown()
+        for I in self.devices.values():
+            I.stop_worker()
+            with I.lock:
+                I.H.disconnect()
@@ -0,0 +1,64 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |===============================================WAVE TABLE CACHE===================================================|
+# |Normalized W1/W2 tables, ready to upload, shared by all ScienceLab instances                                    |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class WaveTableCache(object):
+    """
+	Bounded LRU cache of wave generator tables. Each entry holds the exact bytes uploaded by LOAD_WAVEFORM1/2
+	(512 ints followed by 32 bytes) and their SHA1 digest, which ScienceLab.loaded_tables uses to recognize a table
+	that is already on the device.
+	"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.tables = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tables)
+
+    def get(self, key, make_points, amp):
+        """
+		:return: (payload, digest) for `key`, computing it from make_points() and `amp` on a miss
+		"""
+        with self._lock:
+            entry = self.tables.get(key)
+            if entry is not None:
+                self.tables.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        payload = self.payload(make_points(), amp)
+        entry = (payload, hashlib.sha1(payload).hexdigest())
+        with self._lock:
+            self.tables[key] = entry
+            while len(self.tables) > self.maxsize:
+                self.tables.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def payload(points, amp=0.95):
+        """
+		Normalize and scale. y1 = array with 512 points between 0 and 511*amp, y2 = 32 points between 0 and 63*amp
+		"""
+        points = np.asarray(points, dtype=float)
+        LARGE_MAX = 511 * amp  # A form of amplitude control. This decides the max PWM duty cycle out of 512 clocks
+        SMALL_MAX = 63 * amp  # Max duty cycle out of 64 clocks
+        y1 = points - points.min()
+        y1 = 1. - y1 / y1.max()
+        y1 = np.round(LARGE_MAX - LARGE_MAX * y1).astype(np.dtype(CP.ShortInt.format))
+        y2 = points[::16] - points[::16].min()
+        y2 = 1. - y2 / y2.max()
+        y2 = np.round(SMALL_MAX - SMALL_MAX * y2).astype(np.uint8)
+        return y1.tobytes() + y2.tobytes()
+
+    def clear(self):
+        with self._lock:
+            self.tables.clear()
+
+
+WAVE_TABLES = WaveTableCache()
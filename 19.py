@@ -0,0 +1,89 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |===============================================WAVEFORM LIBRARY===================================================|
+# |Vectorized shapes for load_equation. Each takes the phase (0 to 1, 512 points) and returns the table values     |
+# -------------------------------------------------------------------------------------------------------------------#
+
+def _wave_square(x, duty=0.5):
+    return np.where(x < duty, 1., -1.)
+
+
+def _wave_sawtooth(x, width=1.):
+    """
+	Rises from -1 to 1 over the first `width` of the cycle, and falls back over the rest. width=0.5 is a triangle
+	"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(x < width, -1 + 2 * x / width, 1 - 2 * (x - width) / (1 - width))
+
+
+def _wave_chirp(x, f0=1., f1=8.):
+    """
+	Sweep from f0 to f1 cycles per table. Use integer f0 and f1 with an even (f1-f0) for a seamless loop
+	"""
+    return np.sin(2 * np.pi * (f0 * x + (f1 - f0) * x * x / 2))
+
+
+def _wave_harmonics(x, amplitudes=(1.,), phases=None):
+    """
+	Sum of sines. amplitudes[k] and phases[k](radians) belong to harmonic k+1
+	"""
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    phases = np.zeros(len(amplitudes)) if phases is None else np.asarray(phases, dtype=float)
+    k = np.arange(1, len(amplitudes) + 1)
+    return amplitudes.dot(np.sin(2 * np.pi * np.outer(k, x) + phases[:, None]))
+
+
+def _wave_gaussian(x, sigma=0.1, center=0.5):
+    return np.exp(-(x - center) ** 2 / (2. * sigma ** 2))
+
+
+def _wave_noise(x, seed=0):
+    return np.random.RandomState(seed).uniform(-1, 1, len(x))
+
+
+WAVEFORMS = {
+    'square': _wave_square,
+    'sawtooth': _wave_sawtooth,
+    'chirp': _wave_chirp,
+    'harmonics': _wave_harmonics,
+    'gaussian': _wave_gaussian,
+    'noise': _wave_noise,
+}
+
+# name : (shape, parameters, amp). Since tables are normalized to their full range before upload, amplitude is the
+# only level control available; the DC level follows from it.
+WAVEFORM_PRESETS = {
+    'pulse': ('square', {'duty': 0.1}, 0.95),
+    'ramp_up': ('sawtooth', {'width': 1.}, 0.95),
+    'ramp_down': ('sawtooth', {'width': 0.}, 0.95),
+    'square_half': ('square', {'duty': 0.5}, 0.5),
+    'sawtooth_half': ('sawtooth', {'width': 1.}, 0.5),
+    'clipped_sine': ('harmonics', {'amplitudes': (1., 0., 1. / 9, 0., 1. / 25)}, 0.95),
+}
+
+
+def waveform_points(name, **params):
+    """
+	Evaluate a shape from WAVEFORMS (or a preset from WAVEFORM_PRESETS) on 512 points in one vectorized pass.
+	>>> waveform_points('square', duty=0.25)[:4]
+	array([1., 1., 1., 1.])
+	"""
+    if name in WAVEFORM_PRESETS:
+        name, preset, amp = WAVEFORM_PRESETS[name]
+        params = dict(preset, **params)
+    x = np.arange(512) / 512.
+    return WAVEFORMS[name](x, **params)
+
+
+def waveform_params_key(params):
+    """
+	Hashable key for the parameters of a named shape. Arrays and sequences are hashed by their bytes, since the
+	repr of a large numpy array is truncated and would give different tables the same key.
+	"""
+    key = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (np.ndarray, list, tuple)):
+            a = np.asarray(value)
+            value = (a.dtype.str, a.shape, hashlib.sha1(np.ascontiguousarray(a).tobytes()).hexdigest())
+        key.append((name, value))
+    return tuple(key)
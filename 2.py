@@ -4,6 +4,17 @@ def __print__(self, *args):
                 print(a, end="")
             print()
 
+    def __sleep__(self, seconds, idle=False):
+        """
+		time.sleep, except while a batch records or replays a call. Its commands all go out in one write, so there
+		is nothing to wait for between them.
+		idle=True marks a wait with no reply pending. If the call runs on the I/O worker of :func:`threadsafe`, other
+		queued calls may use the device in the meantime.
+		"""
+        if isinstance(self.H, _BatchHandler): return
+        if idle and self.worker is not None: self.worker.idle(seconds)
+        else: time.sleep(seconds)
+
     def get_version(self):
         """
 		Returns the version string of the device
@@ -43,9 +54,129 @@ def __print__(self, *args):
         self.H.reconnect(**kwargs)
         self.__runInitSequence__(**kwargs)
 
+    def batch(self):
+        """
+		Queue many calls and exchange all their command bytes and replies in a single write and a single read.
+		Every call made on the returned object gives back a Future holding its result once the batch is flushed.
+		Calls are only pipelined if they talk to the device exclusively through self.H
+		.. code-block:: python
+			with I.batch() as b:
+				b.set_state(SQR1=1)
+				states = b.get_states()
+				volts = b.get_average_voltage('CH1')
+			print(states.result(), volts.result())
+		"""
+        return Batch(self)
+
+    def threadsafe(self, priority=1):
+        """
+		Returns a proxy of this instance that may be shared between threads.
+		Every method call made through the proxy is handed to a dedicated I/O worker thread (started on first use),
+		which runs one complete transaction at a time while holding self.lock. Pending calls are served in order of
+		priority (lower values first), so a high-rate reader with priority=0 is not stuck behind queued low-rate calls.
+		.. code-block:: python
+			gui = I.threadsafe(priority=0)
+			logger = I.threadsafe(priority=2)
+			threading.Thread(target=lambda: logger.get_states()).start()
+			print(gui.get_voltage('CH1'))
+		"""
+        if self.worker is None or not self.worker.thread.is_alive():
+            self.worker = DeviceWorker(self)
+        return ThreadSafeScienceLab(self, priority)
+
+    def stop_worker(self):
+        """
+		Stops the I/O worker thread started by :func:`threadsafe` once its pending calls are done.
+		"""
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
     def get_voltage(self, channel_name, **kwargs):
-        self.voltmeter_autorange(channel_name)
-        return self.get_average_voltage(channel_name, **kwargs)
+        """
+		Voltage on the selected channel, with automatic gain selection on CH1 and CH2.
+		The gain chosen for each channel is remembered in self.gains, and the next reading is taken with it directly.
+		The channel is only ranged again if a reading gets within 2% of the full scale of that gain (it may be
+		clipped, so the full :func:`voltmeter_autorange` is used), or drops more than self.autorange_hysteresis below
+		the lowest voltage that gain is chosen for (a higher gain is then selected from the reading itself).
+		In steady state a call therefore costs one reading. self.autorange_callback, if set, is called as
+		callback(channel_name, old_gain, new_gain, V) whenever the gain changes. old_gain is 0 on the first decision.
+		"""
+        gain = self.gains.get(channel_name)
+        if not gain or gain != self.oscilloscope._channels[channel_name].gain:  # not ranged, or changed by hand
+            self.voltmeter_autorange(channel_name)
+            return self.get_average_voltage(channel_name, **kwargs)
+        V = self.get_average_voltage(channel_name, **kwargs)
+        if self.__rerange__(channel_name, V): return self.get_average_voltage(channel_name, **kwargs)
+        return V
+
+    def __rerange__(self, channel_name, V):
+        """
+		Applies the gain decision of :func:`get_voltage` to a reading V taken with the cached gain.
+		:return: True if the gain was changed, and the channel must be read again
+		"""
+        gain = self.gains.get(channel_name)
+        if not gain: return False  # not a ranged channel
+        low = min(cutoff for cutoff, g in self.AUTORANGE_CUTOFFS if g == gain)
+        if abs(V) >= abs(self.oscilloscope._channels[channel_name].scale(0)) * 0.98:
+            self.voltmeter_autorange(channel_name)
+        elif abs(V) < low * (1 - self.autorange_hysteresis):
+            self.__autoSelectRange__(channel_name, V)
+        else:
+            return False
+        return True
+
+    def get_voltages(self, channels=('CH1', 'CH2', 'CH3', 'MIC', 'SEN', 'IN1'), samples=1, as_dict=False):
+        """
+		Read several channels in one pipelined transaction: the requests for every channel go out in a single
+		write, and all replies come back in a single read.
+		CH1 and CH2 use the gain cached by :func:`get_voltage`, and are ranged the same way. A channel that was never
+		ranged, or whose gain was changed by hand, is ranged before the transaction. A channel whose reading calls
+		for another gain is read again, together with the other such channels.
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==============  ============================================================================================
+		**Arguments**
+		==============  ============================================================================================
+		channels        list of channels. default ('CH1', 'CH2', 'CH3', 'MIC', 'SEN', 'IN1')
+		samples         readings averaged per channel. Each one is itself the sum of 16 ADC conversions. default 1
+		as_dict         return {channel: voltage} instead of an array. default False
+		==============  ============================================================================================
+		:return: array of voltages in the order of `channels`, or a dictionary
+		>>> I.get_voltages(['CH1', 'CH2', 'SEN'])
+		array([1.002, -0.498, 3.27 ])
+		"""
+        channels = list(channels)
+        for c in channels:
+            channel = self.oscilloscope._channels[c]
+            channel.resolution = 12
+            if channel.gain is not None and (not self.gains.get(c) or self.gains[c] != channel.gain):
+                self.voltmeter_autorange(c)
+        V = self.__scale_voltages__(channels, self.__get_raw_voltages__(channels, int(samples)))
+        ranged = [n for n, c in enumerate(channels) if self.__rerange__(c, V[n])]
+        if ranged:
+            again = [channels[n] for n in ranged]
+            V[ranged] = self.__scale_voltages__(again, self.__get_raw_voltages__(again, int(samples)))
+        return dict(zip(channels, V.tolist())) if as_dict else V
+
+    def __scale_voltages__(self, channels, raw):
+        return np.array([self.oscilloscope._channels[c].scale(r) for c, r in zip(channels, raw)])
+
+    def __get_raw_voltages__(self, channels, samples, chunk=128):
+        """
+		Returns the average of `samples` readings (each the average of 16 raw 12-bit ADC values) for every channel.
+		At most `chunk` requests are sent per write.
+		"""
+        commands = b''.join((CP.ADC + CP.GET_VOLTAGE_SUMMED + CP.Byte.pack(self.oscilloscope._channels[c].chosa))
+                            * samples for c in channels)
+        size = len(CP.ADC + CP.GET_VOLTAGE_SUMMED) + 1
+        reply = np.dtype([('sum', CP.ShortInt.format), ('ack', CP.Byte.format)])
+        total = len(channels) * samples
+        V_sum = np.empty(total)
+        for start in range(0, total, chunk):
+            n = min(chunk, total - start)
+            self.H.fd.write(commands[start * size:(start + n) * size])
+            V_sum[start:start + n] = np.frombuffer(self.__read_bulk__(n * reply.itemsize), dtype=reply)['sum']
+        return V_sum.reshape(len(channels), samples).mean(axis=1) / 16.
 
     def voltmeter_autorange(self, channel_name):
         try:
@@ -56,13 +187,10 @@ def __print__(self, *args):
         return self.__autoSelectRange__(channel_name, V)
 
     def __autoSelectRange__(self, channel_name, V):
-        keys = [8, 4, 3, 2, 1.5, 1, .5, 0]
-        cutoffs = {8: 1, 4: 2, 3: 4, 2: 5, 1.5: 8, 1.: 10, .5: 16, 0: 32}
-        for a in keys:
-            if abs(V) > a:
-                g = cutoffs[a]
-                break
+        g = next(g for cutoff, g in self.AUTORANGE_CUTOFFS if abs(V) > cutoff or cutoff == 0)
         self.oscilloscope._channels[channel_name].gain = g
+        old, self.gains[channel_name] = self.gains.get(channel_name, 0), g
+        if old != g and self.autorange_callback is not None: self.autorange_callback(channel_name, old, g, V)
         return g
 
     def __autoRangeScope__(self, tg):
@@ -79,7 +207,7 @@ def __print__(self, *args):
 		+============+=========================================================================================+
 		|channel_name| 'CH1','CH2','CH3', 'MIC','IN1','SEN','V+'                                               |
 		+------------+-----------------------------------------------------------------------------------------+
-		|sleep       | read voltage in CPU sleep mode. not particularly useful. Also, Buggy.                   |
+		|sleep       | deprecated and ignored. Readings are pipelined, and the CPU is no longer put to sleep   |
 		+------------+-----------------------------------------------------------------------------------------+
 		|\*\*kwargs  | Samples to average can be specified. eg. samples=100 will average a hundred readings    |
 		+------------+-----------------------------------------------------------------------------------------+
@@ -88,41 +216,67 @@ def __print__(self, *args):
 		>>> self.__print__(I.get_average_voltage('CH4'))
 		1.002
 		"""
-        self.oscilloscope._channels[channel_name].resolution = 12
-        scale = self.oscilloscope._channels[channel_name].scale
-        vals = [self.__get_raw_average_voltage__(channel_name, **kwargs) for a in range(int(kwargs.get('samples', 1)))]
-        # if vals[0]>2052:print (vals)
-        val = np.average([scale(a) for a in vals])
-        return val
+        if kwargs.pop('sleep', None) is not None:
+            warnings.warn('the sleep argument of get_average_voltage is ignored', DeprecationWarning, stacklevel=2)
+        kwargs.setdefault('samples', 1)
+        return self.get_voltage_statistics(channel_name, **kwargs)['mean']
 
-    def __get_raw_average_voltage__(self, channel_name, **kwargs):
+    def get_voltage_statistics(self, channel_name, samples=100, **kwargs):
         """
-		Return the average of 16 raw 12-bit ADC values of the voltage on the selected channel
+		Read the voltage on the selected channel many times, and return its statistics.
+		The readings are pipelined: up to `chunk` requests go out in a single write, and their replies are read
+		back together, so the time taken scales with the number of samples rather than with USB latency.
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
-		==============  ============================================================================================================
+		==============  ============================================================================================
 		**Arguments**
-		==============  ============================================================================================================
-		channel_name    'CH1', 'CH2', 'CH3', 'MIC', '5V', 'IN1','SEN'
-		sleep           read voltage in CPU sleep mode
-		==============  ============================================================================================================
+		==============  ============================================================================================
+		channel_name    'CH1','CH2','CH3', 'MIC','IN1','SEN','V+'
+		samples         number of readings. Each one is itself the sum of 16 ADC conversions
+		chunk           Optional. Maximum readings requested per write. default 128
+		==============  ============================================================================================
+		:return: dictionary with the 'mean', 'std', 'min' and 'max' voltage, and the number of 'samples'
+		>>> I.get_voltage_statistics('CH1', samples=1000)
+		{'mean': 1.002, 'std': 0.004, 'min': 0.99, 'max': 1.014, 'samples': 1000}
+		"""
+        self.oscilloscope._channels[channel_name].resolution = 12
+        scale = self.oscilloscope._channels[channel_name].scale
+        V = scale(self.__get_raw_average_voltages__(channel_name, int(samples), kwargs.get('chunk', 128)))
+        return {'mean': float(np.mean(V)), 'std': float(np.std(V)), 'min': float(np.min(V)),
+                'max': float(np.max(V)), 'samples': len(V)}
+
+    def __get_raw_average_voltages__(self, channel_name, samples, chunk=128):
+        """
+		Returns an array of `samples` readings, each the average of 16 raw 12-bit ADC values,
+		requested `chunk` at a time with one write and one read per chunk.
 		"""
         chosa = self.oscilloscope._channels[channel_name].chosa
-        self.H.__sendByte__(CP.ADC)
-        self.H.__sendByte__(CP.GET_VOLTAGE_SUMMED)
-        self.H.__sendByte__(chosa)
-        V_sum = self.H.__getInt__()
-        self.H.__get_ack__()
-        return V_sum / 16.  # sum(V)/16.0  #
+        command = CP.ADC + CP.GET_VOLTAGE_SUMMED + CP.Byte.pack(chosa)
+        reply = np.dtype([('sum', CP.ShortInt.format), ('ack', CP.Byte.format)])
+        V_sum = np.empty(samples)
+        for start in range(0, samples, chunk):
+            n = min(chunk, samples - start)
+            self.H.fd.write(command * n)
+            ss = self.__read_bulk__(n * reply.itemsize)
+            V_sum[start:start + n] = np.frombuffer(ss, dtype=reply)['sum']
+        return V_sum / 16.
 
-    def fetch_buffer(self, starting_position=0, total_points=100):
+    def fetch_buffer(self, starting_position=0, total_points=100, **kwargs):
         """
 		fetches a section of the ADC hardware buffer
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==============  ============================================================================================
+		**Arguments**
+		==============  ============================================================================================
+		chunk_size      Optional. Read the block in chunks of this many bytes instead of a single transfer
+		progress        Optional. callback(bytes_done, bytes_total) invoked after every chunk
+		==============  ============================================================================================
 		"""
         self.H.__sendByte__(CP.COMMON)
         self.H.__sendByte__(CP.RETRIEVE_BUFFER)
         self.H.__sendInt__(starting_position)
         self.H.__sendInt__(total_points)
-        for a in range(int(total_points)): self.buff[a] = self.H.__getInt__()
+        ss = self.__read_bulk__(int(total_points) * CP.ShortInt.size, **kwargs)
+        self.buff[:int(total_points)] = np.frombuffer(ss, dtype=np.dtype(CP.ShortInt.format))
         self.H.__get_ack__()
 
     def clear_buffer(self, starting_position, total_points):
@@ -135,28 +289,74 @@ def __print__(self, *args):
         self.H.__sendInt__(total_points)
         self.H.__get_ack__()
 
-    def fill_buffer(self, starting_position, point_array):
+    def fill_buffer(self, starting_position, point_array, **kwargs):
         """
 		fill a section of the ADC hardware buffer with data
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==============  ============================================================================================
+		**Arguments**
+		==============  ============================================================================================
+		chunk_size      Optional. Write the block in chunks of this many bytes instead of a single transfer
+		progress        Optional. callback(bytes_done, bytes_total) invoked after every chunk
+		==============  ============================================================================================
+		Every value must fit in an unsigned 16-bit word (0-65535), otherwise ValueError is raised and nothing is sent.
 		"""
+        data = np.asarray(point_array)
+        if data.size and (data.min() < 0 or data.max() > 0xFFFF):
+            raise ValueError('fill_buffer values must be in the range 0-65535, got %s to %s' % (data.min(), data.max()))
+        data = data.astype(np.dtype(CP.ShortInt.format))
         self.H.__sendByte__(CP.COMMON)
         self.H.__sendByte__(CP.FILL_BUFFER)
         self.H.__sendInt__(starting_position)
-        self.H.__sendInt__(len(point_array))
-        for a in point_array:
-            self.H.__sendInt__(int(a))
+        self.H.__sendInt__(len(data))
+        self.__write_bulk__(data.tobytes(), **kwargs)
         self.H.__get_ack__()
 
-    def start_streaming(self, tg, channel='CH1'):
+    def __read_bulk__(self, nbytes, chunk_size=None, progress=None):
+        """
+		Reads a block of `nbytes` from the serial port as one bytes object.
+		The whole block is requested in a single read unless chunk_size is specified.
+		"""
+        nbytes = int(nbytes)
+        if not chunk_size or chunk_size >= nbytes:
+            ss = self.H.fd.read(nbytes)
+            if progress: progress(len(ss), nbytes)
+        else:
+            ss = bytearray()
+            while len(ss) < nbytes:
+                chunk = self.H.fd.read(min(chunk_size, nbytes - len(ss)))
+                if not chunk: break
+                ss += chunk
+                if progress: progress(len(ss), nbytes)
+        if len(ss) != nbytes:
+            raise RuntimeError('Bulk read timed out. Received %d of %d bytes' % (len(ss), nbytes))
+        return ss
+
+    def __write_bulk__(self, data, chunk_size=None, progress=None):
+        """
+		Writes a bytes object to the serial port in a single write unless chunk_size is specified.
+		"""
+        total = len(data)
+        if not chunk_size: chunk_size = max(total, 1)
+        view = memoryview(data)
+        for a in range(0, total, chunk_size):
+            self.H.fd.write(view[a:a + chunk_size])
+            if progress: progress(min(a + chunk_size, total), total)
+
+    def start_streaming(self, tg, channel='CH1', **kwargs):
         """
 		Instruct the ADC to start streaming 8-bit data.  use stop_streaming to stop.
+		A background thread collects the samples. see :class:`ADCStream`
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
 		==============  ============================================================================================
 		**Arguments**
 		==============  ============================================================================================
-		tg              timegap. 250KHz clock
+		tg              timegap. 8MHz clock
 		channel         channel 'CH1'... 'CH9','IN1','SEN'
+		capacity        Optional. Size of the ring buffer in samples. default 4M
+		read_size       Optional. Maximum bytes per read from the serial port. default 16k
 		==============  ============================================================================================
+		:return: the ADCStream instance, also stored as self.stream
 		"""
         chosa = self.oscilloscope.channels[channel].chosa
         if (self.streaming): self.stop_streaming()
@@ -165,3 +365,5 @@ def __print__(self, *args):
         self.H.__sendByte__(chosa)
         self.H.__sendInt__(tg)  # Timegap between samples.  8MHz timer clock
         self.streaming = True
+        self.stream = ADCStream(self, tg, channel, **kwargs)
+        return self.stream
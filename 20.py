@@ -0,0 +1,59 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |=================================================TIMING SOLVER====================================================|
+# |Prescaler / period register values for the sine and square wave generators                                      |
+# -------------------------------------------------------------------------------------------------------------------#
+
+TIMING_PRESCALERS = np.array([1, 8, 64, 256])
+TimingSolution = collections.namedtuple('TimingSolution', 'prescaler wavelength frequency error highres')
+
+
+def solve_timing(freq, kind='square'):
+    """
+	Vectorized search for the smallest prescaler (of 64MHz / [1, 8, 64, 256]) whose period register fits in 16 bits.
+	.. tabularcolumns:: |p{3cm}|p{11cm}|
+	==============  ============================================================================================
+	**Arguments**
+	==============  ============================================================================================
+	freq            target frequency, or an array of them
+	kind            'square' : SQR1-4. The period is counted in whole clock ticks (truncated)
+					'sine'   : W1/W2. The period of one table step is rounded, and the 512 point table is
+					used below 1100Hz (highres=1), the 32 point table above
+	==============  ============================================================================================
+	:return: TimingSolution of arrays (scalars for scalar input). prescaler is the index 0-3, or 4 if the frequency is
+	 out of range. frequency is the frequency actually generated, and error = frequency - freq
+	>>> solve_timing(np.logspace(1, 3, 200), 'sine').frequency
+	"""
+    f = np.asarray(freq, dtype=float)
+    scalar = f.ndim == 0
+    f = np.atleast_1d(f)
+    if kind == 'sine':
+        highres = (f < 1100).astype(int)
+        table_size = np.where(highres, 512, 32)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            w = np.round(64e6 / f / TIMING_PRESCALERS[:, None] / table_size)
+    else:
+        highres = np.zeros(len(f), dtype=int)
+        table_size = np.ones(len(f))
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            w = np.floor(64e6 / f / TIMING_PRESCALERS[:, None])
+    fits = w < 65525
+    prescaler = np.where(fits.any(axis=0), fits.argmax(axis=0), 4)
+    wavelength = w[np.minimum(prescaler, 3), np.arange(len(f))]
+    valid = (prescaler < 4) & (wavelength > 0) & np.isfinite(wavelength)
+    prescaler = np.where(valid, prescaler, 4)
+    wavelength = np.where(valid, wavelength, 0).astype(int)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        achieved = np.where(valid, 64e6 / np.maximum(wavelength, 1) / TIMING_PRESCALERS[np.minimum(prescaler, 3)]
+                            / table_size, 0.)
+    result = TimingSolution(prescaler, wavelength, achieved, achieved - f, highres)
+    if scalar: result = TimingSolution(*[a[0].item() for a in result])
+    return result
+
+
+@functools.lru_cache(maxsize=4096)
+def timing_for(freq, kind='square'):
+    """
+	Memoized scalar version of :func:`solve_timing`
+	"""
+    return solve_timing(float(freq), kind)
@@ -0,0 +1,50 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |=================================================CURVE FITTING====================================================|
+# |Small numpy-only fits used by the measurement routines                                                            |
+# -------------------------------------------------------------------------------------------------------------------#
+
+def fit_exponential(t, y, refine=True, iterations=8):
+    """
+	Fit y = A*exp(-t/tau) + c
+	The starting point comes from a weighted linear least squares fit of log(y - c) with c set just below the
+	smallest sample. It is then refined with a few Gauss-Newton steps on all three parameters, which removes the bias
+	of the log fit and the error in c. Everything is vectorized, and only numpy is needed.
+	.. tabularcolumns:: |p{3cm}|p{11cm}|
+	==============  ============================================================================================
+	**Arguments**
+	==============  ============================================================================================
+	t               array of times
+	y               array of values
+	refine          run the Gauss-Newton refinement. default True
+	iterations      maximum Gauss-Newton steps. default 8
+	==============  ============================================================================================
+	:return: ([A, tau, c], fitted y) or None if the data does not look like a decaying exponential
+	>>> (A, tau, c), newy = fit_exponential(x * 1e-6, y)
+	"""
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(t) < 4: return None
+    span = y.max() - y.min()
+    if not span > 0: return None
+    c = y.min() - 1e-3 * span
+    keep = (y - c) > 0.05 * span  # the log of the tail is mostly noise
+    if keep.sum() < 3: return None
+    w = y[keep] - c  # weights undo the noise amplification of the log
+    M = np.vstack((np.ones(keep.sum()), t[keep])) * w
+    (logA, slope), res, rank, sv = np.linalg.lstsq(M.T, np.log(w) * w, rcond=None)
+    if not slope < 0: return None
+    p = np.array([np.exp(logA), -slope, c])  # A, 1/tau, c
+
+    if refine:
+        for a in range(iterations):
+            e = np.exp(-p[1] * t)
+            r = y - (p[0] * e + p[2])
+            J = np.vstack((e, -p[0] * t * e, np.ones(len(t)))).T
+            step = np.linalg.lstsq(J, r, rcond=None)[0]
+            if not np.all(np.isfinite(step)) or p[1] + step[1] <= 0: break
+            p += step
+            if np.all(np.abs(step) <= 1e-9 * (np.abs(p) + 1e-12)): break
+
+    A, k, c = p
+    return [A, 1. / k, c], A * np.exp(-k * t) + c
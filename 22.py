@@ -0,0 +1,60 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |=================================================DEVICE CACHE=====================================================|
+# |Identity, corrections and flash pages of every device seen, kept on the host between connections               |
+# -------------------------------------------------------------------------------------------------------------------#
+
+DEVICE_CACHE_VERSION = 1
+DEVICE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.pslab', 'devices.json')
+
+
+class DeviceCache(object):
+    """
+	JSON file holding one entry per device, keyed by hexid, and the hexid last seen on each serial port.
+	An entry holds the firmware version string, SOCKET_CAPACITANCE, currentScalers, resistanceScaling and the flash
+	pages (base64) that were read from the device. Files written by another DEVICE_CACHE_VERSION are ignored.
+	The contents of cached flash pages are not checked against the device. The device ID and the firmware version are
+	the only checks, so this relies on one hard assumption: the flash of a device is only written through a
+	ScienceLab instance that uses this same file. After the flash was written in any other way (another host, another
+	cache file, a firmware update that keeps the version string), call ScienceLab.clear_flash_cache() and
+	ScienceLab.save_device_cache(), or delete the file.
+	"""
+
+    def __init__(self, path=None):
+        self.path = path or DEVICE_CACHE_PATH
+        self.data = {'version': DEVICE_CACHE_VERSION, 'devices': {}, 'ports': {}}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') == DEVICE_CACHE_VERSION: self.data = data
+        except (IOError, OSError, ValueError):
+            pass
+
+    def lookup(self, port, version, id_word):
+        """
+		:return: the entry of the device last seen on `port`, if its firmware version and the low word of its ID
+		 (read from the device by the caller) still match. None otherwise.
+		"""
+        hexid = self.data['ports'].get(port)
+        entry = self.data['devices'].get(hexid)
+        if entry is None or entry['version'] != version or int(hexid, 16) & 0xFFFF != id_word: return None
+        return dict(entry, hexid=hexid)
+
+    def store(self, hexid, port, **fields):
+        entry = self.data['devices'].setdefault(hexid, {})
+        entry.update(fields)
+        self.data['ports'][port] = hexid
+        self.save()
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.isdir(folder): os.makedirs(folder)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+def _flush_device_cache_at_exit(ref):
+    I = ref()
+    if I is not None: I.__flush_device_cache__()
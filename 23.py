@@ -0,0 +1,127 @@
+# -------------------------------------------------------------------------------------------------------------------#
+
+# |==========================================LOGIC ANALYZER CHANNELS=================================================|
+# |digital_channel with plot axes that are built on demand, in one vectorized pass                                 |
+# -------------------------------------------------------------------------------------------------------------------#
+
+class LazyDigitalChannel(digital_channel):
+    """
+	Drop-in replacement for PSL.digital_channel.digital_channel, used for ScienceLab.dchans.
+	generate_axes() only marks the plot axes as out of date. xaxis, yaxis, plot_length, get_xaxis() and get_yaxis()
+	build them on first access, with array slicing into buffers that are reused while they are large enough.
+	Callers that only need timestamps never pay for the axes, which hold 2 or 3 points per edge.
+	For displays, :func:`decimated_axes` returns a min/max envelope whose size depends on the number of pixels
+	rather than the number of edges.
+	Pinned to the digital_channel class of PSL 1.x (pslab-python before 2.0.0, the releases that still ship
+	PSL/digital_channel.py with digital_channel). It relies on two details of that class: its __init__ assigns
+	xaxis, yaxis and plot_length, which the setters below take over, and its generate_axes draws 2 points per edge
+	for EVERY_EDGE and 3 for the other modes, which __build_axes__ reproduces. pslab 2.0.0 replaced the class with
+	DigitalInput. Check both details again before using this with another release.
+	"""
+
+    def __init__(self, a):
+        self._xaxis = np.zeros(0)
+        self._yaxis = np.zeros(0)
+        self._plot_length = 0
+        self._axes_valid = True
+        digital_channel.__init__(self, a)
+
+    # xaxis, yaxis and plot_length are assigned by digital_channel.__init__, so they need setters.
+    @property
+    def xaxis(self):
+        self.__build_axes__()
+        return self._xaxis
+
+    @xaxis.setter
+    def xaxis(self, value):
+        self._xaxis = value
+
+    @property
+    def yaxis(self):
+        self.__build_axes__()
+        return self._yaxis
+
+    @yaxis.setter
+    def yaxis(self, value):
+        self._yaxis = value
+
+    @property
+    def plot_length(self):
+        self.__build_axes__()
+        return self._plot_length
+
+    @plot_length.setter
+    def plot_length(self, value):
+        self._plot_length = value
+
+    def load_data(self, initial_state, timestamps):
+        digital_channel.load_data(self, initial_state, timestamps)
+        self._axes_valid = False
+
+    def generate_axes(self):
+        self._axes_valid = False
+
+    def get_xaxis(self):
+        self.__build_axes__()
+        return self._xaxis[:self._plot_length]
+
+    def get_yaxis(self):
+        self.__build_axes__()
+        return self._yaxis[:self._plot_length]
+
+    def __levels__(self):
+        """
+		:return: (level before the first edge, level between pulses or None if every edge toggles the level)
+		"""
+        HIGH, LOW = 1, 0
+        state = HIGH if self.initial_state else LOW
+        if self.mode in (DISABLED, EVERY_EDGE): return state, None
+        if self.mode == EVERY_FALLING_EDGE: return HIGH, HIGH
+        return LOW, LOW
+
+    def __build_axes__(self):
+        if self._axes_valid: return
+        self._axes_valid = True
+        n = self.dlength if self.mode != DISABLED else 0
+        ts = self.timestamps[:n]
+        first, rest = self.__levels__()
+        per_edge = 2 if rest is None else 3
+        length = 1 + per_edge * n
+        if len(self._xaxis) < length:
+            self._xaxis = np.empty(length)
+            self._yaxis = np.empty(length)
+        x, y = self._xaxis, self._yaxis
+        x[0] = 0
+        y[0] = first
+        for k in range(per_edge):
+            x[1 + k:length:per_edge] = ts
+        if rest is None:
+            before = (first + np.arange(n)) % 2  # every edge toggles the level
+            y[1:length:2] = before
+            y[2:length:2] = 1 - before
+        else:
+            y[1:length:3] = rest
+            y[2:length:3] = 1 - rest
+            y[3:length:3] = rest
+        self._plot_length = length
+
+    def decimated_axes(self, pixels=1000, t0=0, t1=None):
+        """
+		Min/max envelope of the channel for a display `pixels` wide, covering t0 to t1 (default: the last edge).
+		Each bucket contributes two points at its start time: the lowest and the highest level seen in it. A bucket
+		containing at least one edge spans both levels.
+		:return: x, y arrays of 2*pixels points
+		"""
+        n = self.dlength if self.mode != DISABLED else 0
+        ts = self.timestamps[:n]
+        if t1 is None: t1 = self.maxT if n else t0 + 1
+        starts = np.linspace(t0, t1, pixels + 1)
+        index = np.searchsorted(ts, starts, side='right')  # edges up to each bucket boundary
+        edges = np.diff(index) > 0
+        first, rest = self.__levels__()
+        level = (first + index[:-1]) % 2 if rest is None else np.full(pixels, rest)
+        x = np.repeat(starts[:-1], 2)
+        y = np.empty(2 * pixels)
+        y[0::2] = np.where(edges, 0, level)
+        y[1::2] = np.where(edges, 1, level)
+        return x, y
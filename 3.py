@@ -3,6 +3,9 @@ def stop_streaming(self):
 		Instruct the ADC to stop streaming data
 		"""
         if (self.streaming):
+            if self.stream is not None:
+                self.stream.stop()
+                self.stream = None
             self.H.__sendByte__(CP.STOP_STREAMING)
             self.H.fd.read(20000)
             self.H.fd.flush()
@@ -98,19 +101,23 @@ def stop_streaming(self):
 			#returns wavelength, high time
 			(0.00025,6.25e-05)
 		"""
+        self.__start_freq__(channel, timeout)
+        self.H.waitForData(timeout)
+        return self.__read_freq__()
+
+    def __start_freq__(self, channel, timeout):
         self.H.__sendByte__(CP.COMMON)
         self.H.__sendByte__(CP.GET_FREQUENCY)
         timeout_msb = int((timeout * 64e6)) >> 16
         self.H.__sendInt__(timeout_msb)
         self.H.__sendByte__(self.__calcDChan__(channel))
 
-        self.H.waitForData(timeout)
-
+    def __read_freq__(self):
         tmt = self.H.__getByte__()
         x = [self.H.__getLong__() for a in range(2)]
         self.H.__get_ack__()
         freq = lambda t: 16 * 64e6 / t if (t) else 0
-        # self.__print__(x,tmt,timeout_msb)
+        # self.__print__(x,tmt)
 
         if (tmt): return 0
         return freq(x[1] - x[0])
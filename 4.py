@@ -28,7 +28,7 @@ def r2r_time(self,channel='ID1',timeout=0.1):
 		return rtime(y)
 	'''
 
-    def r2r_time(self, channel, skip_cycle=0, timeout=5):
+    def r2r_time(self, channel, skip_cycle=0, timeout=5, cancel=None):
         """
 		Return a list of rising edges that occured within the timeout period.
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
@@ -38,25 +38,13 @@ def r2r_time(self,channel='ID1',timeout=0.1):
 		channel         The input to measure time between two rising edges.['ID1','ID2','ID3','ID4','SEN','EXT','CNTR']
 		skip_cycle      Number of points to skip. eg. Pendulums pass through light barriers twice every cycle. SO 1 must be skipped
 		timeout         Number of seconds to wait for datapoints. (Maximum 60 seconds)
+		cancel          Optional threading.Event. Setting it from another thread abandons the measurement
 		==============  ==============================================================================================================
 		:return list: Array of points
 		"""
-        if timeout > 60: timeout = 60
-        self.start_one_channel_LA(channel=channel, channel_mode=3, trigger_mode=0)  # every rising edge
-        startTime = time.time()
-        while time.time() - startTime < timeout:
-            a, b, c, d, e = self.get_LA_initial_states()
-            if a == self.MAX_SAMPLES / 4:
-                a = 0
-            if a >= skip_cycle + 2:
-                tmp = self.fetch_long_data_from_LA(a, 1)
-                self.dchans[0].load_data(e, tmp)
-                # print (self.dchans[0].timestamps)
-                return [1e-6 * (self.dchans[0].timestamps[skip_cycle + 1] - self.dchans[0].timestamps[0])]
-            time.sleep(0.1)
-        return []
+        return self.__edge_time__(channel, 3, skip_cycle, timeout, cancel)  # every rising edge
 
-    def f2f_time(self, channel, skip_cycle=0, timeout=5):
+    def f2f_time(self, channel, skip_cycle=0, timeout=5, cancel=None):
         """
 		Return a list of falling edges that occured within the timeout period.
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
@@ -66,23 +54,24 @@ def r2r_time(self,channel='ID1',timeout=0.1):
 		channel         The input to measure time between two falling edges.['ID1','ID2','ID3','ID4','SEN','EXT','CNTR']
 		skip_cycle      Number of points to skip. eg. Pendulums pass through light barriers twice every cycle. SO 1 must be skipped
 		timeout         Number of seconds to wait for datapoints. (Maximum 60 seconds)
+		cancel          Optional threading.Event. Setting it from another thread abandons the measurement
 		==============  ==============================================================================================================
 		:return list: Array of points
 		"""
+        return self.__edge_time__(channel, 2, skip_cycle, timeout, cancel)  # every falling edge
+
+    def __edge_time__(self, channel, channel_mode, skip_cycle, timeout, cancel):
         if timeout > 60: timeout = 60
-        self.start_one_channel_LA(channel=channel, channel_mode=2, trigger_mode=0)  # every falling edge
-        startTime = time.time()
-        while time.time() - startTime < timeout:
-            a, b, c, d, e = self.get_LA_initial_states()
-            if a == self.MAX_SAMPLES / 4:
-                a = 0
-            if a >= skip_cycle + 2:
-                tmp = self.fetch_long_data_from_LA(a, 1)
-                self.dchans[0].load_data(e, tmp)
-                # print (self.dchans[0].timestamps)
-                return [1e-6 * (self.dchans[0].timestamps[skip_cycle + 1] - self.dchans[0].timestamps[0])]
-            time.sleep(0.1)
-        return []
+        self.start_one_channel_LA(channel=channel, channel_mode=channel_mode, trigger_mode=0)
+        states = self.wait_for_LA(skip_cycle + 2, timeout=timeout, cancel=cancel)
+        if states is None: return []
+        return self.__read_edge_time__(states, skip_cycle)
+
+    def __read_edge_time__(self, states, skip_cycle):
+        a, b, c, d, e = states
+        tmp = self.fetch_long_data_from_LA(self.__LA_progress__(), 1)
+        self.dchans[0].load_data(e, tmp)
+        return [1e-6 * (self.dchans[0].timestamps[skip_cycle + 1] - self.dchans[0].timestamps[0])]
 
     def MeasureInterval(self, channel1, channel2, edge1, edge2, timeout=0.1):
         """
@@ -134,11 +134,29 @@ def PulseTime(self, channel='ID1', PulseType='LOW', timeout=0.1):
 							- DISABLED                    = 0
 		trigger_mode        same as channel_mode.
 							default_value : 3
+		points              Optional. Return as soon as this many timestamps have been recorded, instead of waiting
+							for the whole waiting_time
+		cancel              Optional threading.Event. Setting it from another thread stops waiting early
 		=================   ======================================================================================================
 		:return:  timestamp array in Seconds
 		>>> I.capture_edges(0.2,channel='ID1',trigger_channel='ID1',channel_mode=3,trigger_mode = 3)
 		#captures rising edges only. with rising edge trigger on ID1
 		"""
+        self.__start_edges1__(**args)
+
+        points = args.get('points')
+        cancel = args.get('cancel')
+        data = None
+        if points:
+            data = self.wait_for_LA(points, timeout=waiting_time, cancel=cancel)
+        elif cancel is not None:
+            cancel.wait(waiting_time)
+        else:
+            self.__sleep__(waiting_time, idle=True)
+
+        return self.__fetch_edges1__(data)
+
+    def __start_edges1__(self, **args):
         aqchan = args.get('channel', 'ID1')
         trchan = args.get('trigger_channel', aqchan)
 
@@ -147,9 +165,8 @@ def PulseTime(self, channel='ID1', PulseType='LOW', timeout=0.1):
 
         self.start_one_channel_LA(channel=aqchan, channel_mode=aqmode, trigger_channel=trchan, trigger_mode=trmode)
 
-        time.sleep(waiting_time)
-
-        data = self.get_LA_initial_states()
+    def __fetch_edges1__(self, data=None):
+        if data is None: data = self.get_LA_initial_states()
         tmp = self.fetch_long_data_from_LA(data[0], 1)
         # data[4][0] -> initial state
         return tmp / 64e6
@@ -199,6 +216,7 @@ def PulseTime(self, channel='ID1', PulseType='LOW', timeout=0.1):
         self.H.__sendByte__(trigger)
         self.H.__get_ack__()
         self.digital_channels_in_buffer = 1
+        self.__reset_LA_fetch__()
         for a in self.dchans:
             a.prescaler = 0
             a.datatype = 'long'
@@ -35,6 +35,7 @@ def start_one_channel_LA(self, **args):
         self.H.__sendByte__((trchan << 4) | trmode)
         self.H.__get_ack__()
         self.digital_channels_in_buffer = 1
+        self.__reset_LA_fetch__()
 
         a = self.dchans[0]
         a.prescaler = 0
@@ -113,6 +114,7 @@ def start_one_channel_LA(self, **args):
             a.name = strchans[n]
             n += 1
         self.digital_channels_in_buffer = 2
+        self.__reset_LA_fetch__()
 
     def start_three_channel_LA(self, **args):
         """
@@ -149,6 +151,7 @@ def start_one_channel_LA(self, **args):
 
         self.H.__get_ack__()
         self.digital_channels_in_buffer = 3
+        self.__reset_LA_fetch__()
 
         n = 0
         for a in self.dchans[:3]:
@@ -55,6 +55,7 @@ def start_four_channel_LA(self, trigger=1, maximum_time=0.001, mode=[1, 1, 1, 1]
         self.H.__sendByte__(trigger)
         self.H.__get_ack__()
         self.digital_channels_in_buffer = 4
+        self.__reset_LA_fetch__()
         n = 0
         for a in self.dchans:
             a.prescaler = prescale
@@ -80,6 +81,8 @@ def start_four_channel_LA(self, trigger=1, maximum_time=0.001, mode=[1, 1, 1, 1]
         s = self.H.__getByte__()
         s_err = self.H.__getByte__()
         self.H.__get_ack__()
+        # progress as recorded. The values returned below also use 0 to mean a full buffer
+        self.LA_points = [int(max(0, a)) for a in (A, B, C, D)]
 
         if A == 0: A = self.MAX_SAMPLES / 4
         if B == 0: B = self.MAX_SAMPLES / 4
@@ -94,6 +97,136 @@ def start_four_channel_LA(self, trigger=1, maximum_time=0.001, mode=[1, 1, 1, 1]
         return A, B, C, D, {'ID1': (s & 1 != 0), 'ID2': (s & 2 != 0), 'ID3': (s & 4 != 0), 'ID4': (s & 8 != 0),
                             'SEN': (s & 16 != 16)}  # SEN is inverted comparator output.
 
+    def __reset_LA_fetch__(self):
+        """
+		Forget what was fetched from the previous logic analyzer acquisition. Called by every start_*_LA function.
+		"""
+        self.LA_fetched = [0, 0, 0, 0]
+        self.LA_points = [0, 0, 0, 0]  # points recorded per slot, as of the last get_LA_initial_states
+        self.LA_unwrap = [{'last': None, 'wrapped': False, 'offset': 0.} for a in range(4)]
+
+    def __fetch_LA_tail__(self, channel_number, count):
+        """
+		Downloads the timestamps recorded by self.dchans[channel_number] since the previous call, straight from the
+		channel's section of the ADC buffer with RETRIEVE_BUFFER, and appends them to the preallocated array
+		self.LA_timestamps[channel_number] (uS). self.LA_fetched[channel_number] holds the number of points fetched.
+		"""
+        a = self.dchans[channel_number]
+        done = self.LA_fetched[channel_number]
+        if count <= done: return
+        if a.datatype == 'int':
+            start = a.channel_number * self.MAX_SAMPLES // 4 + done
+            raw = np.frombuffer(self.__retrieve_words__(start, count - done), dtype=np.dtype(CP.ShortInt.format))
+            ticks = self.__unwrap_LA_rollovers__(raw.astype(np.float64), self.LA_unwrap[channel_number])
+        else:
+            start = a.channel_number * self.MAX_SAMPLES // 2 + 2 * done
+            ticks = np.frombuffer(self.__retrieve_words__(start, 2 * (count - done)), dtype=np.dtype(CP.Integer.format))
+        self.LA_timestamps[channel_number][done:count] = ticks
+        self.LA_timestamps[channel_number][done:count] *= [1. / 64, 1. / 8, 1., 4.][a.prescaler]
+        self.LA_fetched[channel_number] = count
+
+    def __retrieve_words__(self, starting_position, total_points):
+        """
+		Raw bytes of a section of the ADC hardware buffer
+		"""
+        self.H.__sendByte__(CP.COMMON)
+        self.H.__sendByte__(CP.RETRIEVE_BUFFER)
+        self.H.__sendInt__(starting_position)
+        self.H.__sendInt__(total_points)
+        ss = self.__read_bulk__(int(total_points) * CP.ShortInt.size)
+        self.H.__get_ack__()
+        return ss
+
+    def __LA_progress__(self, channel_number=0):
+        """
+		Number of points recorded by self.dchans[channel_number] as of the last :func:`get_LA_initial_states`.
+		Unlike the values returned by get_LA_initial_states, an empty slot gives 0 and a full one MAX_SAMPLES/4.
+		"""
+        a = self.dchans[channel_number]
+        return self.LA_points[a.channel_number if a.datatype == 'int' else a.channel_number * 2]
+
+    def wait_for_LA(self, points=1, channel_number=0, timeout=5, cancel=None, poll_interval=2e-4,
+                    max_poll_interval=0.05):
+        """
+		Wait until a running logic analyzer acquisition has recorded `points` timestamps on one channel.
+		The progress is polled with an interval that starts at poll_interval and doubles up to max_poll_interval,
+		so short acquisitions return almost immediately while long ones cost few status round trips.
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==================  ============================================================================================
+		**Arguments**
+		==================  ============================================================================================
+		points              number of timestamps to wait for
+		channel_number      index in self.dchans of the channel to watch. default 0
+		timeout             seconds to wait before giving up
+		cancel              Optional threading.Event. Setting it from another thread ends the wait early
+		==================  ============================================================================================
+		:return: the output of :func:`get_LA_initial_states` once enough points are available, or None on
+		 timeout or cancellation
+		"""
+        start = time.time()
+        delay = poll_interval
+        while True:
+            states = self.__LA_ready__(points, channel_number)
+            if states is not None: return states
+            remaining = timeout - (time.time() - start)
+            if remaining <= 0 or (cancel is not None and cancel.is_set()): return None
+            if cancel is not None:
+                cancel.wait(min(delay, remaining))
+            else:
+                self.__sleep__(min(delay, remaining), idle=True)
+            delay = min(delay * 2, max_poll_interval)
+
+    def __LA_ready__(self, points, channel_number=0):
+        """
+		One poll of :func:`wait_for_LA`
+		:return: the output of :func:`get_LA_initial_states` once `points` timestamps were recorded, None before that
+		"""
+        states = self.get_LA_initial_states()
+        if self.__LA_progress__(channel_number) >= points: return states
+        return None
+
+    def stream_LA_edges(self, channel_number=0, points=None, timeout=5, cancel=None, poll_interval=2e-4,
+                        max_poll_interval=0.05):
+        """
+		Generator that yields the timestamps(seconds) recorded by a running logic analyzer acquisition as they arrive.
+		Each iteration yields an array holding only the edges that were not yet yielded. Polling backs off
+		exponentially while nothing new arrives, and resets as soon as edges show up.
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==================  ============================================================================================
+		**Arguments**
+		==================  ============================================================================================
+		channel_number      index in self.dchans of the channel to read. default 0
+		points              stop after this many timestamps. default: until the buffer fills up
+		timeout             stop if no new edges arrive for this many seconds
+		cancel              Optional threading.Event. Setting it ends the generator
+		==================  ============================================================================================
+		>>> I.start_one_channel_LA(channel='ID1', channel_mode=3, trigger_mode=0)
+		>>> for edges in I.stream_LA_edges(points=100):
+		...     print(np.diff(edges))
+		"""
+        limit = min(points or self.MAX_SAMPLES // 4, self.MAX_SAMPLES // 4)
+        done = 0
+        last_edge = time.time()
+        delay = poll_interval
+        while done < limit:
+            self.get_LA_initial_states()
+            count = self.__LA_progress__(channel_number)
+            if count > done:
+                self.__fetch_LA_tail__(channel_number, count)
+                new = self.LA_timestamps[channel_number][done:min(count, limit)] * 1e-6
+                done += len(new)
+                last_edge = time.time()
+                delay = poll_interval
+                yield new
+                continue
+            remaining = timeout - (time.time() - last_edge)
+            if remaining <= 0 or (cancel is not None and cancel.is_set()): return
+            if cancel is not None:
+                cancel.wait(min(delay, remaining))
+            else:
+                self.__sleep__(min(delay, remaining), idle=True)
+            delay = min(delay * 2, max_poll_interval)
+
     def stop_LA(self):
         """
 		Stop any running logic analyzer function
@@ -102,7 +235,7 @@ def start_four_channel_LA(self, trigger=1, maximum_time=0.001, mode=[1, 1, 1, 1]
         self.H.__sendByte__(CP.STOP_LA)
         self.H.__get_ack__()
 
-    def fetch_int_data_from_LA(self, bytes, chan=1):
+    def fetch_int_data_from_LA(self, bytes, chan=1, out=None):
         """
 		fetches the data stored by DMA. integer address increments
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
@@ -111,6 +244,8 @@ def start_four_channel_LA(self, trigger=1, maximum_time=0.001, mode=[1, 1, 1, 1]
 		==============  ============================================================================================
 		bytes:          number of readings(integers) to fetch
 		chan:           channel number (1-4)
+		out:            optional preallocated float array to decode into. A view of it is returned, so repeated
+						captures do not allocate.
 		==============  ============================================================================================
 		"""
         self.H.__sendByte__(CP.TIMING)
@@ -119,18 +254,49 @@ def start_four_channel_LA(self, trigger=1, maximum_time=0.001, mode=[1, 1, 1, 1]
         self.H.__sendByte__(chan - 1)
 
         ss = self.H.fd.read(int(bytes * 2))
-        t = np.zeros(int(bytes) * 2)
-        for a in range(int(bytes)):
-            t[a] = CP.ShortInt.unpack(ss[a * 2:a * 2 + 2])[0]
-
         self.H.__get_ack__()
 
-        t = np.trim_zeros(t)
-        b = 1
-        rollovers = 0
-        while b < len(t):
-            if (t[b] < t[b - 1] and t[b] != 0):
-                rollovers += 1
-                t[b:] += 65535
-            b += 1
+        t = self.__decode_LA_dump__(ss, CP.ShortInt, out)
+        self.__unwrap_LA_rollovers__(t)
+        return t
+
+    def __decode_LA_dump__(self, ss, fmt, out=None):
+        """
+		Decodes a raw DMA dump of `fmt` (CP.ShortInt / CP.Integer) values through a zero-copy np.frombuffer view.
+		Leading and trailing zeros (unfilled DMA slots) are trimmed. If `out` is supplied, the samples are written
+		into it and a view of the filled section is returned.
+		"""
+        dtype = np.dtype(fmt.format)
+        raw = np.trim_zeros(np.frombuffer(ss, dtype=dtype, count=len(ss) // dtype.itemsize))
+        if out is None:
+            return raw.astype(np.float64)
+        if len(out) < len(raw):
+            raise ValueError('output array too small. need %d points' % len(raw))
+        t = out[:len(raw)]
+        t[:] = raw
+        return t
+
+    def __unwrap_LA_rollovers__(self, t, state=None):
+        """
+		Corrects 16-bit counter rollovers in place by adding 65535 after every wrap.
+		A drop to a raw zero only counts as a wrap once an earlier wrap has already occurred.
+		Data that arrives in pieces is unwrapped by passing the same `state` with every piece (see
+		__reset_LA_fetch__). It carries the last raw value, whether a wrap has happened yet, and the offset
+		accumulated so far.
+		"""
+        if state is None: state = {'last': None, 'wrapped': False, 'offset': 0.}
+        if not len(t): return t
+        last = t[-1]
+        prev = np.empty(len(t))
+        prev[1:] = t[:-1]
+        prev[0] = t[0] if state['last'] is None else state['last']
+        desc = t < prev
+        wraps = desc & (t != 0)
+        wrapped_before = state['wrapped'] | ((np.cumsum(wraps) - wraps) > 0)
+        wraps |= desc & wrapped_before
+        total = np.cumsum(wraps)
+        t += state['offset'] + 65535 * total
+        state['last'] = last
+        state['wrapped'] = state['wrapped'] or bool(total[-1])
+        state['offset'] += 65535 * total[-1]
         return t
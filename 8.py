@@ -1,4 +1,4 @@
- def fetch_long_data_from_LA(self, bytes, chan=1):
+ def fetch_long_data_from_LA(self, bytes, chan=1, out=None):
         """
 		fetches the data stored by DMA. long address increments
 		.. tabularcolumns:: |p{3cm}|p{11cm}|
@@ -7,6 +7,8 @@
 		==============  ============================================================================================
 		bytes:          number of readings(long integers) to fetch
 		chan:           channel number (1,2)
+		out:            optional preallocated float array to decode into. A view of it is returned, so repeated
+						captures do not allocate.
 		==============  ============================================================================================
 		"""
         self.H.__sendByte__(CP.TIMING)
@@ -15,20 +17,43 @@
         self.H.__sendByte__(chan - 1)
         ss = self.H.fd.read(int(bytes * 4))
         self.H.__get_ack__()
-        tmp = np.zeros(int(bytes))
-        for a in range(int(bytes)):
-            tmp[a] = CP.Integer.unpack(ss[a * 4:a * 4 + 4])[0]
-        tmp = np.trim_zeros(tmp)
-        return tmp
+        return self.__decode_LA_dump__(ss, CP.Integer, out)
 
-    def fetch_LA_channels(self):
+    def fetch_LA_channels(self, incremental=False):
         """
 		reads and stores the channels in self.dchans.
+		.. tabularcolumns:: |p{3cm}|p{11cm}|
+		==============  ============================================================================================
+		**Arguments**
+		==============  ============================================================================================
+		incremental     Only download the points recorded since the previous call, and append them to what was
+						already fetched. Use this to refresh a display while a long acquisition is running.
+						dchans[n].timestamps is then a view of self.LA_timestamps[n]
+		==============  ============================================================================================
 		"""
         data = self.get_LA_initial_states()
         # print (data)
         for a in range(4):
-            if (self.dchans[a].channel_number < self.digital_channels_in_buffer): self.__fetch_LA_channel__(a, data)
+            if (self.dchans[a].channel_number < self.digital_channels_in_buffer):
+                if incremental:
+                    self.__fetch_LA_channel_incremental__(a, data)
+                else:
+                    self.__fetch_LA_channel__(a, data)
+        return True
+
+    def __fetch_LA_channel_incremental__(self, channel_number, initial_states):
+        a = self.dchans[channel_number]
+        count = self.__LA_progress__(channel_number)
+        self.__fetch_LA_tail__(channel_number, count)
+        if a.initial_state_override:
+            a.initial_state = (a.initial_state_override - 1) == 1
+            a.initial_state_override = False
+        else:
+            a.initial_state = initial_states[4][a.name]
+        a.timestamps = self.LA_timestamps[channel_number][:self.LA_fetched[channel_number]]
+        a.dlength = len(a.timestamps)
+        a.maxT = a.timestamps[-1] if a.dlength else 0
+        a.generate_axes()
         return True
 
     def __fetch_LA_channel__(self, channel_number, initial_states):
@@ -105,3 +130,4 @@
         self.H.__sendByte__(CP.SET_STATE)
         self.H.__sendByte__(data)
         self.H.__get_ack__()
+        for a in kwargs: self.wavegen_registers.pop(a, None)  # the pin no longer follows its generator